@@ -0,0 +1,52 @@
+import gzip
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import PARSERS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MIN_SECONDS = 1.0
+# detail source -> (fixture, parser method)
+SOURCES = {
+    "page": ("job_view.html", "parse_job"),
+    "fragment": ("job_posting_fragment.html", "parse_fragment"),
+}
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def ms_per_page(parse, html):
+    parse(html)
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        parse(html)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_SECONDS:
+            return elapsed / runs * 1000
+
+
+def main():
+    pages = {source: load_fixture(fixture) for source, (fixture, _) in SOURCES.items()}
+    parsers = {name: cls() for name, cls in PARSERS.items()}
+
+    # The fragment must yield exactly the details the full page does
+    for name, parser in parsers.items():
+        assert parser.parse_fragment(pages["fragment"]) == parser.parse_job(pages["page"]), f"{name}: fragment mismatch"
+
+    print(f"{'source':<10}{'bytes/job':>12}{'gzip bytes/job':>16}" + "".join(f"{name + ' ms':>16}" for name in parsers))
+    for source, (_, method) in SOURCES.items():
+        body = pages[source].encode("utf-8")
+        timings = "".join(f"{ms_per_page(getattr(parser, method), pages[source]):>16.3f}" for parser in parsers.values())
+        print(f"{source:<10}{len(body):>12}{len(gzip.compress(body)):>16}{timings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import PARSERS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MIN_SECONDS = 2.0
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def pages_per_second(parse, html):
+    parse(html)
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        parse(html)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_SECONDS:
+            return runs / elapsed
+
+
+def main():
+    listing_html = load_fixture("listing_page.html")
+    job_html = load_fixture("job_view.html")
+    parsers = {name: cls() for name, cls in PARSERS.items()}
+
+    # Every backend must extract exactly what the BeautifulSoup reference does
+    expected_listing = parsers["bs4"].parse_listing(listing_html)
+    expected_job = parsers["bs4"].parse_job(job_html)
+    for name, parser in parsers.items():
+        assert parser.parse_listing(listing_html) == expected_listing, f"{name}: listing mismatch"
+        assert parser.parse_job(job_html) == expected_job, f"{name}: job page mismatch"
+        assert parser.parse_listing("") is None, f"{name}: empty page not detected"
+
+    print(f"{'backend':<12}{'listing pages/s':>18}{'job pages/s':>16}")
+    for name, parser in parsers.items():
+        listing_rate = pages_per_second(parser.parse_listing, listing_html)
+        job_rate = pages_per_second(parser.parse_job, job_html)
+        print(f"{name:<12}{listing_rate:>18.1f}{job_rate:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper
+from http_client import RateLimiter
+from fixture_server import FixtureServer
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def latency_summary(latencies):
+    return {f"p{pct}_ms": round(percentile(latencies, pct) * 1000, 1) for pct in (50, 95, 99)}
+
+
+def reset_scraper(base_url, args, latencies):
+    # Point the scraper at the fixture server with a fresh, effectively unthrottled limiter
+    scraper.LINKEDIN_BASE_URL = base_url
+    scraper.JOB_CATEGORIES = scraper.JOB_CATEGORIES[:args.categories]
+    scraper.LOCATIONS = scraper.LOCATIONS[:args.locations]
+    scraper.rate_limiter = RateLimiter(rate=args.rate, max_rate=args.rate, burst=args.rate)
+    scraper.fetcher.limiter = scraper.rate_limiter
+    scraper.fetcher.close()
+    scraper.parse_timer = scraper.StageTimer()
+    scraper.page_parser = scraper.get_parser(args.parser)
+    scraper.job_detail_source = args.detail_source
+
+    fetch = type(scraper.fetcher).fetch
+
+    def timed_fetch(url, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fetch(scraper.fetcher, url, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    scraper.fetcher.fetch = timed_fetch
+
+
+def bench_listings(base_url, args):
+    latencies = []
+    reset_scraper(base_url, args, latencies)
+    alias, category, location = next(scraper.iter_queries())
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        listings = scraper.scrape_job_listings(alias, category, location, set())
+    elapsed = time.perf_counter() - started
+    return listings, {
+        "pages": len(latencies),
+        "pages_per_sec": round(len(latencies) / elapsed, 1),
+        **latency_summary(latencies),
+        "parse_seconds": round(scraper.parse_timer.seconds, 3)
+    }
+
+
+def bench_details(base_url, args, listings):
+    latencies = []
+    reset_scraper(base_url, args, latencies)
+    jobs = listings[:args.detail_jobs]
+    received = scraper.fetcher.metrics.total("http_response_bytes_total")
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for job in jobs:
+            scraper.scrape_job_details(job)
+    elapsed = time.perf_counter() - started
+    received = scraper.fetcher.metrics.total("http_response_bytes_total") - received
+    return {
+        "jobs": len(jobs),
+        "jobs_per_sec": round(len(jobs) / elapsed, 1),
+        "bytes_per_job": round(received / len(jobs)) if jobs else 0,
+        **latency_summary(latencies),
+        "parse_seconds": round(scraper.parse_timer.seconds, 3)
+    }
+
+
+def run_pipeline(base_url, args, workdir):
+    latencies = []
+    reset_scraper(base_url, args, latencies)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            filename = scraper.main(
+                engine=args.engine, store_path=None, cache_path=None, checkpoint_dir=os.path.join(workdir, "checkpoint"),
+                parser_backend=args.parser, parse_workers=args.parse_workers, detail_source=args.detail_source
+            )
+        elapsed = time.perf_counter() - started
+        with open(filename, encoding="utf-8") as f:
+            rows = sum(1 for _ in f) - 1
+    finally:
+        os.chdir(cwd)
+    return elapsed, rows, latencies
+
+
+def bench_pipeline(base_url, args):
+    with tempfile.TemporaryDirectory() as workdir:
+        elapsed, rows, latencies = run_pipeline(base_url, args, workdir)
+        result = {
+            "rows": rows,
+            "requests": len(latencies),
+            "seconds": round(elapsed, 2),
+            "jobs_per_sec": round(rows / elapsed, 1),
+            "requests_per_sec": round(len(latencies) / elapsed, 1),
+            **latency_summary(latencies),
+            "parse_seconds": round(scraper.parse_timer.seconds, 3)
+        }
+        if args.memory:
+            # Separate run: tracemalloc slows allocation-heavy code down considerably
+            tracemalloc.start()
+            run_pipeline(base_url, args, workdir)
+            result["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+            tracemalloc.stop()
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scraper offline against recorded fixtures.")
+    parser.add_argument("--engine", choices=["threads", "async"], default="threads")
+    parser.add_argument("--parser", default="auto")
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--detail-source", choices=scraper.DETAIL_SOURCES, default=scraper.DETAIL_SOURCE)
+    parser.add_argument("--categories", type=int, default=2, help="job categories to crawl in the pipeline run")
+    parser.add_argument("--locations", type=int, default=2, help="locations to crawl in the pipeline run")
+    parser.add_argument("--pages", type=int, default=8, help="listing pages per query before results run dry")
+    parser.add_argument("--overlap", type=float, default=0.3, help="share of each listing page common to all queries")
+    parser.add_argument("--latency-ms", type=float, default=20, help="simulated server latency per request")
+    parser.add_argument("--rate", type=float, default=1000, help="request rate limit in req/s")
+    parser.add_argument("--detail-jobs", type=int, default=50, help="jobs fetched in the detail stage")
+    parser.add_argument("--no-memory", action="store_false", dest="memory", help="skip the tracemalloc run")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = FixtureServer(pages=args.pages, overlap=args.overlap, latency=args.latency_ms / 1000)
+    base_url = server.start()
+    try:
+        listings, listing_result = bench_listings(base_url, args)
+        results = {
+            "config": vars(args),
+            "scrape_job_listings": listing_result,
+            "scrape_job_details": bench_details(base_url, args, listings),
+            "pipeline": bench_pipeline(base_url, args)
+        }
+    finally:
+        server.stop()
+
+    for stage in ("scrape_job_listings", "scrape_job_details", "pipeline"):
+        print(f"{stage}: " + ", ".join(f"{key}={value}" for key, value in results[stage].items()))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
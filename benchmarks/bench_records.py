@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper
+from output import LISTING_FIELDS, OUTPUT_FIELDS
+from records import JobRecord
+
+
+def checkpoint_lines(count):
+    # Pending jobs the way a resumed run reads them back: every row parsed from its own
+    # JSON line, so nothing shares string objects unless the record interns them
+    queries = list(scraper.iter_queries())
+    for index in range(count):
+        alias, category, location = queries[index % len(queries)]
+        yield json.dumps({
+            "job_id": str(4000000000 + index), "original_category": category,
+            "search_location": location, "search_term_used": alias
+        })
+
+
+def job_rows(count):
+    for line in checkpoint_lines(count):
+        row = dict.fromkeys(OUTPUT_FIELDS)
+        row.update(json.loads(line))
+        row["job_url"] = scraper.job_view_url(row["job_id"])
+        yield row
+
+
+def traced_bytes(build):
+    tracemalloc.start()
+    rows = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    return size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-row memory of dict rows and JobRecord.")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    cases = {
+        "pending dict": lambda: [json.loads(line) for line in checkpoint_lines(args.rows)],
+        "pending JobRecord": lambda: [
+            JobRecord(*(row[field] for field in LISTING_FIELDS))
+            for row in map(json.loads, checkpoint_lines(args.rows))
+        ],
+        "full row dict": lambda: list(job_rows(args.rows)),
+        "full row JobRecord": lambda: [JobRecord.from_dict(row) for row in job_rows(args.rows)],
+    }
+    print(f"{'rows':<20}{'MB':>10}{'bytes/row':>12}")
+    for name, build in cases.items():
+        size = traced_bytes(build)
+        print(f"{name:<20}{size / 2 ** 20:>10.1f}{size / args.rows:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
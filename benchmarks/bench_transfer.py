@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bench_pipeline
+import scraper
+from fixture_server import FixtureServer
+
+# name -> (Accept-Encoding, stop early at the markers)
+TRANSFER_MODES = {
+    "identity, full body": ("identity", False),
+    "identity, early stop": ("identity", True),
+    "compressed, full body": (scraper.ACCEPT_ENCODINGS, False),
+    "compressed, early stop": (scraper.ACCEPT_ENCODINGS, True),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bytes downloaded per job with and without compression and early stop.")
+    parser.add_argument("--detail-jobs", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    server = FixtureServer(latency=0)
+    base_url = server.start()
+    headers_factory, stop_markers = scraper.fetcher.headers_factory, scraper.fetcher.stop_markers
+    print(f"{'detail source':<15}{'transfer':<26}{'bytes/job':>12}{'connections':>13}{'jobs/s':>10}")
+    try:
+        for detail_source in scraper.DETAIL_SOURCES:
+            bench_args = bench_pipeline.parse_args(["--detail-source", detail_source, "--detail-jobs", str(args.detail_jobs)])
+            listings, _ = bench_pipeline.bench_listings(base_url, bench_args)
+            for name, (encoding, early_stop) in TRANSFER_MODES.items():
+                scraper.fetcher.headers_factory = lambda encoding=encoding: {**headers_factory(), "Accept-Encoding": encoding}
+                scraper.fetcher.stop_markers = stop_markers if early_stop else ()
+                opened = scraper.fetcher.stats()["connections_opened"]
+                result = bench_pipeline.bench_details(base_url, bench_args, listings)
+                opened = scraper.fetcher.stats()["connections_opened"] - opened
+                print(f"{detail_source:<15}{name:<26}{result['bytes_per_job']:>12}{opened:>13}{result['jobs_per_sec']:>10}")
+    finally:
+        scraper.fetcher.headers_factory, scraper.fetcher.stop_markers = headers_factory, stop_markers
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
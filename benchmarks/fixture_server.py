@@ -0,0 +1,103 @@
+import gzip
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+URN_RE = re.compile(r"urn:li:jobPosting:\d+")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class FixtureServer:
+    # Local stand-in for www.linkedin.com that serves the recorded fixtures over
+    # keep-alive HTTP/1.1. Listing pages get job ids derived from (keywords, start)
+    # with `overlap` of every page shared between queries, and each query runs dry
+    # after `pages` pages, like a real search. Bodies are gzipped for clients that
+    # accept it unless `compress` is off.
+    def __init__(self, pages=8, overlap=0.3, latency=0.02, compress=True):
+        self.pages = pages
+        self.overlap = overlap
+        self.latency = latency
+        self.compress = compress
+        self.listing_template = load_fixture("listing_page.html")
+        self.job_page = load_fixture("job_view.html").encode("utf-8")
+        self.job_fragment = load_fixture("job_posting_fragment.html").encode("utf-8")
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def listing_page(self, keywords, start):
+        if start // 25 >= self.pages:
+            return b""
+        shared = int(25 * self.overlap)
+        query_key = zlib.crc32(keywords.encode("utf-8"))
+        ids = iter(
+            [7000000000 + start + i for i in range(shared)] +
+            [4000000000 + (query_key % 100000) * 1000 + start + i for i in range(shared, 25)]
+        )
+        return URN_RE.sub(lambda _: f"urn:li:jobPosting:{next(ids)}", self.listing_template).encode("utf-8")
+
+    def handle(self, path):
+        url = urlparse(path)
+        if "/seeMoreJobPostings/" in url.path:
+            query = parse_qs(url.query)
+            return 200, self.listing_page(query.get("keywords", [""])[0], int(query.get("start", ["0"])[0]))
+        if "/jobs/view/" in url.path:
+            return 200, self.job_page
+        if "/jobs-guest/jobs/api/jobPosting/" in url.path:
+            return 200, self.job_fragment
+        return 404, b""
+
+    def start(self):
+        fixture_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if fixture_server.latency:
+                    time.sleep(fixture_server.latency)
+                status, body = fixture_server.handle(self.path)
+                gzipped = fixture_server.compress and body and "gzip" in self.headers.get("Accept-Encoding", "")
+                if gzipped:
+                    body = gzip.compress(body, compresslevel=6)
+                with fixture_server._lock:
+                    fixture_server.requests += 1
+                    fixture_server.bytes_sent += len(body)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            def handle_error(self, request, client_address):
+                # Clients that stop reading a body early close the connection mid-write
+                if not isinstance(sys.exc_info()[1], ConnectionError):
+                    super().handle_error(request, client_address)
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
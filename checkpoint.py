@@ -0,0 +1,89 @@
+import json
+import os
+import time
+from datetime import datetime
+from threading import Lock
+
+CHECKPOINT_DIR = "checkpoint"
+# Older checkpoints are discarded on --resume: the daily workflow always resumes, and
+# a run that died yesterday must not skip today's queries or reuse yesterday's rows.
+# Longer than a run, shorter than the interval between two runs.
+CHECKPOINT_MAX_AGE = 20 * 3600
+
+
+class Checkpoint:
+    # On-disk state of an unfinished run: frontier.json is rewritten atomically with the
+    # pending work, rows.jsonl gets every completed detail row appended as it finishes.
+    def __init__(self, directory=CHECKPOINT_DIR):
+        self.directory = directory
+        self.frontier_path = os.path.join(directory, "frontier.json")
+        self.rows_path = os.path.join(directory, "rows.jsonl")
+        self._lock = Lock()
+        self._rows_file = None
+
+    def exists(self):
+        return os.path.exists(self.frontier_path) or os.path.exists(self.rows_path)
+
+    def age(self):
+        # Seconds since the frontier was saved, or since rows.jsonl was last written
+        # when there is no frontier yet
+        try:
+            with open(self.frontier_path, encoding="utf-8") as f:
+                saved_at = json.load(f).get("saved_at")
+            if saved_at:
+                return (datetime.now() - datetime.fromisoformat(saved_at)).total_seconds()
+        except (OSError, ValueError):
+            pass
+        if os.path.exists(self.rows_path):
+            return time.time() - os.path.getmtime(self.rows_path)
+        return None
+
+    def load(self):
+        frontier = {}
+        if os.path.exists(self.frontier_path):
+            with open(self.frontier_path, encoding="utf-8") as f:
+                frontier = json.load(f)
+
+        return frontier, self.iter_rows()
+
+    def iter_rows(self):
+        if not os.path.exists(self.rows_path):
+            return
+        with open(self.rows_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line cut short by the crash
+                    continue
+
+    def open(self, resume=False):
+        os.makedirs(self.directory, exist_ok=True)
+        if not resume:
+            self.clear()
+        self._rows_file = open(self.rows_path, "a", encoding="utf-8")
+
+    def append_row(self, row):
+        line = json.dumps(row, ensure_ascii=False)
+        with self._lock:
+            self._rows_file.write(line + "\n")
+            self._rows_file.flush()
+
+    def save_frontier(self, frontier):
+        tmp_path = self.frontier_path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(frontier, f, ensure_ascii=False)
+            os.replace(tmp_path, self.frontier_path)
+
+    def close(self):
+        with self._lock:
+            if self._rows_file:
+                self._rows_file.close()
+                self._rows_file = None
+
+    def clear(self):
+        self.close()
+        for path in (self.frontier_path, self.rows_path):
+            if os.path.exists(path):
+                os.remove(path)
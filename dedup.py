@@ -0,0 +1,61 @@
+from array import array
+from bisect import bisect_left
+from threading import Lock
+
+DEDUP_SHARDS = 16
+
+
+def id_key(job_id):
+    # LinkedIn job ids are numeric; ints hash to themselves and take far less memory
+    return int(job_id) if job_id.isdigit() else job_id
+
+
+class ShardedIdSet:
+    # The run-wide job-id set, split into shards that each have their own lock so
+    # listing workers claiming different ids don't serialize on one lock. Membership
+    # checks take no lock at all, which lets listing parsing drop known ids early.
+    def __init__(self, ids=(), shards=DEDUP_SHARDS):
+        self._sets = [set() for _ in range(shards)]
+        self._locks = [Lock() for _ in range(shards)]
+        for job_id in ids:
+            self.add(job_id)
+
+    def _shard(self, key):
+        return hash(key) % len(self._sets)
+
+    def __contains__(self, job_id):
+        key = id_key(job_id)
+        return key in self._sets[self._shard(key)]
+
+    def add(self, job_id):
+        # Returns True only for the caller that claims the id first
+        key = id_key(job_id)
+        index = self._shard(key)
+        with self._locks[index]:
+            if key in self._sets[index]:
+                return False
+            self._sets[index].add(key)
+            return True
+
+    def __len__(self):
+        return sum(len(ids) for ids in self._sets)
+
+
+class IdHistory:
+    # Job ids seen on previous days as one sorted array of 64-bit ints: 8 bytes per id
+    # and a binary search per lookup, against ~100 bytes per id for a set of strings.
+    def __init__(self, ids=()):
+        self._ids = array("q", sorted({int(job_id) for job_id in ids if job_id.isdigit()}))
+
+    def __contains__(self, job_id):
+        if not job_id.isdigit():
+            return False
+        key = int(job_id)
+        index = bisect_left(self._ids, key)
+        return index < len(self._ids) and self._ids[index] == key
+
+    def __len__(self):
+        return len(self._ids)
+
+    def nbytes(self):
+        return self._ids.itemsize * len(self._ids)
@@ -0,0 +1,184 @@
+import json
+import sqlite3
+import time
+import zlib
+from threading import Lock
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_PATH = "http_cache.db"
+CACHE_MAX_BYTES = 256 * 2 ** 20
+CACHE_COMPRESSION_LEVEL = 6
+# After eviction the cache is trimmed to this share of max_bytes, so it doesn't
+# evict again on the very next store
+CACHE_EVICT_TO = 0.9
+VALIDATOR_HEADERS = (("ETag", "If-None-Match"), ("Last-Modified", "If-Modified-Since"))
+
+
+def cached_response(url, body, headers):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = "utf-8"
+    return response
+
+
+class ResponseCache:
+    # Disk-backed cache of successful GET responses in SQLite, bodies zlib-compressed.
+    # `ttls` is a sequence of (url substring, seconds); a url is cached under the first
+    # rule it matches and not at all if none does. Stale entries that carry an ETag or
+    # Last-Modified are revalidated with a conditional request instead of refetched.
+    # Least recently used entries are evicted once the stored bodies exceed max_bytes.
+    def __init__(self, path=CACHE_PATH, ttls=(), max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttls = tuple(ttls)
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY,"
+            " headers TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        self.total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evicted = 0
+        self.bytes_saved = 0
+        if self.total_bytes > self.max_bytes:
+            # max_bytes was lowered since the cache was written
+            with self._lock:
+                self._evict()
+                self._conn.commit()
+
+    def ttl(self, url):
+        for pattern, seconds in self.ttls:
+            if pattern in url:
+                return seconds
+        return None
+
+    def _load(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT headers, body, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def _touch(self, url, revalidated=False):
+        now = time.time()
+        with self._lock:
+            if not revalidated:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url))
+            else:
+                self._conn.execute("UPDATE responses SET accessed_at = ?, stored_at = ? WHERE url = ?", (now, now, url))
+            self._conn.commit()
+
+    def fresh(self, url):
+        # A fresh cached response, or None when the url has to go to the network
+        ttl = self.ttl(url)
+        if ttl is None:
+            return None
+        entry = self._load(url)
+        if entry is None or time.time() - entry[2] > ttl:
+            # Counted by update() once the network answers: as revalidated or a miss
+            return None
+        headers, body, _ = entry
+        body = zlib.decompress(body)
+        self._touch(url)
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(body)
+        return cached_response(url, body, headers)
+
+    def validators(self, url):
+        # Conditional request headers for a stale entry that can be revalidated
+        if self.ttl(url) is None:
+            return {}
+        entry = self._load(url)
+        if entry is None:
+            return {}
+        headers = CaseInsensitiveDict(entry[0])
+        return {request: headers[name] for name, request in VALIDATOR_HEADERS if name in headers}
+
+    def update(self, url, response):
+        # Feeds a network response through the cache: a 304 is answered from the stored
+        # body, a 200 is stored; anything else passes through untouched
+        if self.ttl(url) is None:
+            return response
+        entry = self._load(url) if response.status_code == 304 else None
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            if response.status_code == 200:
+                self.store(url, response)
+            return response
+        headers, body, _ = entry
+        body = zlib.decompress(body)
+        self._touch(url, revalidated=True)
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += len(body)
+        return cached_response(url, body, headers)
+
+    def store(self, url, response):
+        headers = {name: response.headers[name] for name in ("Content-Type", "ETag", "Last-Modified")
+                   if name in response.headers}
+        body = zlib.compress(response.content, CACHE_COMPRESSION_LEVEL)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, headers, body, size, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(headers), body, len(body), now, now)
+            )
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Caller holds the lock; drops least recently used entries down to CACHE_EVICT_TO
+        target = self.max_bytes * CACHE_EVICT_TO
+        rows = self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        evicted = []
+        for url, size in rows:
+            if self.total_bytes <= target:
+                break
+            evicted.append((url,))
+            self.total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
+        self.evicted += len(evicted)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.revalidated + self.misses
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "entries": entries,
+                "stored_bytes": self.total_bytes,
+                "evicted": self.evicted
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,401 @@
+import random
+import threading
+import time
+from collections import Counter
+from threading import Lock
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 10
+REQUEST_TIMEOUT = 30
+
+INITIAL_RATE = 2.0
+MIN_RATE = 0.2
+MAX_RATE = 10.0
+RATE_INCREASE = 0.2
+RATE_DECREASE = 0.5
+SLOW_RESPONSE_SECONDS = 5.0
+SLOW_RESPONSE_DECREASE = 0.9
+BURST = 2
+JITTER = 0.3
+THROTTLE_STATUSES = {429, 999}
+THROTTLE_BACKOFF = 5.0
+MAX_THROTTLE_BACKOFF = 300.0
+THROTTLE_RETRIES = 3
+# Every encoding urllib3 can decode here: gzip and deflate always, br when brotli is
+# installed, zstd when zstandard is
+ACCEPT_ENCODINGS = ACCEPT_ENCODING.replace(",", ", ")
+STREAM_CHUNK_SIZE = 2 * 1024
+MAX_BODY_BYTES = 4 * 2 ** 20
+# Cutting a body short closes its connection, and the next request pays a TCP+TLS
+# handshake (a few KB of certificates and two round trips). A body is only cut when
+# at least this much of it is still on the wire; otherwise the rest is drained and
+# the connection goes back to the keep-alive pool.
+EARLY_STOP_MIN_BYTES = 64 * 1024
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    # Wraps the urllib3 connection classes so every TCP(+TLS) connect is reported,
+    # which lets us tell opened connections apart from reused keep-alive ones. Counting
+    # connect() rather than the pool's _new_conn() also catches a pooled connection
+    # object that urllib3 silently reconnects after the socket was dropped.
+    def __init__(self, on_new_connection, **kwargs):
+        self.on_new_connection = on_new_connection
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_new_connection = self.on_new_connection
+        pool_classes = {}
+        for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items():
+            base_connection = pool_cls.ConnectionCls
+
+            def connect(connection, _base=base_connection):
+                on_new_connection()
+                return _base.connect(connection)
+            connection_cls = type(f"Counting{base_connection.__name__}", (base_connection,), {"connect": connect})
+            pool_classes[scheme] = type(f"Counting{pool_cls.__name__}", (pool_cls,), {"ConnectionCls": connection_cls})
+        self.poolmanager.pool_classes_by_scheme = pool_classes
+
+
+class _HostBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+
+
+class RateLimiter:
+    # Per-host token bucket whose refill rate adapts AIMD-style: every successful
+    # response adds RATE_INCREASE / rate req/s (about +RATE_INCREASE per second of
+    # clean traffic), while 429/999/5xx responses multiply it by RATE_DECREASE and
+    # block the host for the (jittered) Retry-After period.
+    def __init__(self, rate=INITIAL_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE, burst=BURST):
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self._lock = Lock()
+        self._buckets = {}
+        self.responses = 0
+        self.throttle_events = 0
+        self.error_events = 0
+        self.slow_responses = 0
+        self.waited_seconds = 0.0
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _HostBucket(self.initial_rate, self.burst)
+        return bucket
+
+    def reserve(self, host, give_up_at=None):
+        # Takes a token for host and returns how long the caller must wait before
+        # sending; tokens may go negative so concurrent callers queue up in order.
+        # Returns None, taking nothing, when the wait would end at or after
+        # give_up_at (a time.monotonic() value).
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            wait = max(0.0, (1 - bucket.tokens) / bucket.rate, bucket.blocked_until - now)
+            wait += random.uniform(0, JITTER / bucket.rate)
+            if give_up_at is not None and now + wait >= give_up_at:
+                return None
+            bucket.tokens -= 1
+            self.waited_seconds += wait
+        return wait
+
+    def record(self, host, status, latency, retry_after=None):
+        # Returns the event the response counted as: "throttle", "error", "slow" or None
+        with self._lock:
+            bucket = self._bucket(host)
+            self.responses += 1
+            if status is None or status in THROTTLE_STATUSES or status >= 500:
+                if status in THROTTLE_STATUSES:
+                    self.throttle_events += 1
+                    event = "throttle"
+                else:
+                    self.error_events += 1
+                    event = "error"
+                bucket.rate = max(self.min_rate, bucket.rate * RATE_DECREASE)
+                bucket.consecutive_throttles += 1
+                if retry_after is None:
+                    retry_after = min(MAX_THROTTLE_BACKOFF, THROTTLE_BACKOFF * 2 ** (bucket.consecutive_throttles - 1))
+                pause = retry_after * random.uniform(1, 1 + JITTER)
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + pause)
+                bucket.tokens = min(bucket.tokens, 0)
+                return event
+            if latency > SLOW_RESPONSE_SECONDS:
+                self.slow_responses += 1
+                bucket.rate = max(self.min_rate, bucket.rate * SLOW_RESPONSE_DECREASE)
+                return "slow"
+            bucket.consecutive_throttles = 0
+            bucket.rate = min(self.max_rate, bucket.rate + RATE_INCREASE / bucket.rate)
+            return None
+
+    def rate(self, host):
+        with self._lock:
+            return self._bucket(host).rate
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "rates": {host: round(bucket.rate, 3) for host, bucket in self._buckets.items()},
+                "responses": self.responses,
+                "throttle_events": self.throttle_events,
+                "error_events": self.error_events,
+                "slow_responses": self.slow_responses,
+                "waited_seconds": round(self.waited_seconds, 1)
+            }
+
+
+class OutOfTime(requests.Timeout):
+    # Raised by Fetcher.get when the rate limiter's wait would run past its time_left
+    pass
+
+
+def parse_retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class Fetcher:
+    # Thread-safe HTTP fetcher: each worker thread gets its own requests.Session
+    # (sessions are not safe to share across threads) with a keep-alive pool.
+    # An optional ResponseCache answers fresh urls without a request, and an optional
+    # Metrics registry gets every request labelled with its url kind (see url_kinds).
+    # Bodies are streamed: a url matching one of `stop_markers` (url substring, marker
+    # strings) stops downloading once all its markers have been seen in order, if
+    # enough of the body is left (see EARLY_STOP_MIN_BYTES), and no body is read
+    # past max_body_bytes. A body cut short is not returned to the pool, so its
+    # keep-alive connection is closed.
+    def __init__(self, headers_factory=None, pool_connections=POOL_CONNECTIONS,
+                 pool_maxsize=POOL_MAXSIZE, timeout=REQUEST_TIMEOUT, limiter=None,
+                 throttle_retries=THROTTLE_RETRIES, cache=None, metrics=None, url_kinds=(),
+                 stop_markers=(), max_body_bytes=MAX_BODY_BYTES):
+        self.headers_factory = headers_factory
+        self.limiter = limiter
+        self.cache = cache
+        self.metrics = metrics
+        self.url_kinds = tuple(url_kinds)
+        self.stop_markers = tuple((pattern, tuple(marker.encode("utf-8") for marker in markers))
+                                  for pattern, markers in stop_markers)
+        self.max_body_bytes = max_body_bytes
+        self.throttle_retries = throttle_retries
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = Lock()
+        self._sessions = []
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self.fetch_seconds = 0.0
+        self._in_flight = Counter()
+
+    def _count_connection(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            for prefix in ("https://", "http://"):
+                session.mount(prefix, CountingHTTPAdapter(
+                    self._count_connection,
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize
+                ))
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def url_kind(self, url):
+        # url_kinds: (url substring, label) pairs, e.g. listing vs job pages
+        for pattern, kind in self.url_kinds:
+            if pattern in url:
+                return kind
+        return "other"
+
+    def markers_for(self, url):
+        for pattern, markers in self.stop_markers:
+            if pattern in url:
+                return markers
+        return ()
+
+    @staticmethod
+    def worth_stopping(response):
+        # Compressed or not, only when enough is left to pay for the reconnect; a body
+        # of unknown length (chunked) is drained instead, still bounded by max_body_bytes
+        try:
+            remaining = int(response.headers["Content-Length"]) - response.raw.tell()
+        except (KeyError, ValueError):
+            return False
+        return remaining >= EARLY_STOP_MIN_BYTES
+
+    def read_body(self, response, markers):
+        # Reads the decoded body until the last marker or max_body_bytes. Returns the
+        # bytes read off the wire and why it stopped early ("marker" or "cap"), or None
+        # when it read the whole body.
+        body = bytearray()
+        pending = list(markers)
+        search_from = 0
+        stopped = None
+        chunks = response.iter_content(STREAM_CHUNK_SIZE)
+        for chunk in chunks:
+            body += chunk
+            while pending:
+                index = body.find(pending[0], search_from)
+                if index < 0:
+                    # A marker may straddle two chunks
+                    search_from = max(search_from, len(body) - len(pending[0]) + 1)
+                    break
+                search_from = index + len(pending.pop(0))
+            if len(body) >= self.max_body_bytes:
+                stopped = "cap"
+            elif markers and not pending:
+                if self.worth_stopping(response):
+                    stopped = "marker"
+                else:
+                    # Keep what was read so far; the rest is only read to reuse the connection
+                    drained = len(body)
+                    for chunk in chunks:
+                        drained += len(chunk)
+                        if drained >= self.max_body_bytes:
+                            stopped = "cap"
+                            break
+                    break
+            if stopped:
+                break
+        wire_bytes = response.raw.tell()
+        if stopped:
+            # Closes the socket; releasing a half-read connection would drain it first
+            response.close()
+        response._content = bytes(body[:self.max_body_bytes])
+        response._content_consumed = True
+        return wire_bytes, stopped
+
+    def cached(self, url):
+        response = self.cache.fresh(url) if self.cache else None
+        if response is not None and self.metrics:
+            self.metrics.inc("http_cache_hits_total", kind=self.url_kind(url))
+        return response
+
+    def wait_time(self, url, give_up_at=None):
+        # None when the wait would end at or after give_up_at, see RateLimiter.reserve
+        wait = self.limiter.reserve(urlparse(url).netloc, give_up_at) if self.limiter else 0.0
+        if wait is None:
+            return None
+        if self.metrics:
+            self.metrics.inc("sleep_seconds_total", wait, reason="rate_limit")
+        return wait
+
+    def should_retry(self, response, attempt):
+        return response.status_code in THROTTLE_STATUSES and attempt < self.throttle_retries
+
+    def record_limit(self, url, status, elapsed, retry_after=None):
+        # Feeds the outcome to the limiter and mirrors the host's rate and its throttle,
+        # error and slow-response events into the metrics registry
+        if not self.limiter:
+            return
+        host = urlparse(url).netloc
+        event = self.limiter.record(host, status, elapsed, retry_after)
+        if self.metrics:
+            self.metrics.set_gauge("rate_limiter_rate", self.limiter.rate(host), host=host)
+            if event:
+                self.metrics.inc("rate_limiter_events_total", host=host, event=event)
+
+    def fetch(self, url, headers=None, **kwargs):
+        # A single request with no waiting; the outcome is fed back to the limiter
+        if headers is None and self.headers_factory:
+            headers = self.headers_factory()
+        if self.cache:
+            headers = {**(headers or {}), **self.cache.validators(url)}
+        kwargs.setdefault("timeout", self.timeout)
+        kind = self.url_kind(url)
+        with self._lock:
+            self.requests_sent += 1
+            self._in_flight[kind] += 1
+        started = time.monotonic()
+        try:
+            response = self.session().get(url, headers=headers, stream=True, **kwargs)
+            wire_bytes, stopped = self.read_body(response, self.markers_for(url))
+        except requests.RequestException:
+            self.record_limit(url, None, time.monotonic() - started)
+            if self.metrics:
+                self.metrics.inc("http_requests_total", kind=kind, status="error")
+            raise
+        finally:
+            with self._lock:
+                self._in_flight[kind] -= 1
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self.fetch_seconds += elapsed
+        if self.metrics:
+            self.metrics.inc("http_requests_total", kind=kind, status=str(response.status_code))
+            self.metrics.observe("http_request_seconds", elapsed, kind=kind)
+            # Bytes off the wire, i.e. still compressed, vs. the decoded body
+            self.metrics.inc("http_response_bytes_total", wire_bytes, kind=kind)
+            self.metrics.inc("http_body_bytes_total", len(response.content), kind=kind)
+            if stopped:
+                self.metrics.inc("http_bodies_truncated_total", kind=kind, reason=stopped)
+        self.record_limit(url, response.status_code, elapsed, parse_retry_after(response.headers.get("Retry-After")))
+        if self.cache:
+            response = self.cache.update(url, response)
+        return response
+
+    def get(self, url, use_cache=True, time_left=None, **kwargs):
+        # use_cache=False skips fresh cache entries; the request may still be answered
+        # by a revalidated one, since a 304 means the page did not change. With
+        # time_left (seconds), a wait that would outlast it is not slept: the last
+        # throttled response is returned, or OutOfTime raised before the first request.
+        cached = self.cached(url) if use_cache else None
+        if cached is not None:
+            return cached
+        give_up_at = time.monotonic() + time_left if time_left is not None else None
+        attempt = 0
+        response = None
+        while True:
+            wait = self.wait_time(url, give_up_at)
+            if wait is None:
+                if response is not None:
+                    return response
+                raise OutOfTime(f"no time left to wait for {url}")
+            time.sleep(wait)
+            response = self.fetch(url, **kwargs)
+            if not self.should_retry(response, attempt):
+                return response
+            attempt += 1
+
+    def in_flight(self, *kinds):
+        with self._lock:
+            return sum(self._in_flight[kind] for kind in kinds)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "requests": self.requests_sent,
+                "connections_opened": self.connections_opened,
+                "connections_reused": max(self.requests_sent - self.connections_opened, 0),
+                "fetch_seconds": self.fetch_seconds
+            }
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
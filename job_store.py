@@ -0,0 +1,154 @@
+import json
+import sqlite3
+import time
+from threading import Lock
+
+from dedup import IdHistory
+from refresh_policy import posted_at, volatile_changed
+
+STORE_PATH = "linkedin_jobs.db"
+
+
+class JobStore:
+    # SQLite-backed memory of scraped job details keyed by job_id, so a daily run only
+    # refetches postings that are new or whose stored details have gone stale. Stale
+    # means older than max_age, or due according to refresh_policy when one is set.
+    def __init__(self, path=STORE_PATH, max_age=None, refresh_policy=None):
+        self.path = path
+        self.max_age = max_age
+        self.refresh_policy = refresh_policy
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        # Added after the first release; older stores get them on open
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, definition in (("posted_at", "REAL"),
+                                   ("fetches", "INTEGER NOT NULL DEFAULT 1"),
+                                   ("changes", "INTEGER NOT NULL DEFAULT 0")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        # Which job ids each alias/location query returned, for the query planner
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_hits ("
+            " alias TEXT NOT NULL,"
+            " location TEXT NOT NULL,"
+            " job_id TEXT NOT NULL,"
+            " seen_at REAL NOT NULL,"
+            " PRIMARY KEY (alias, location, job_id))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_runs ("
+            " alias TEXT NOT NULL,"
+            " location TEXT NOT NULL,"
+            " last_run REAL NOT NULL,"
+            " PRIMARY KEY (alias, location))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.known_ids = None
+
+    def index_ids(self):
+        # Load every stored job id into a compact in-memory index so that ids first
+        # seen today are answered without touching SQLite
+        with self._lock:
+            rows = self._conn.execute("SELECT job_id FROM jobs").fetchall()
+        self.known_ids = IdHistory(job_id for job_id, in rows)
+        return self.known_ids
+
+    def get(self, job_id, max_age=None):
+        max_age = self.max_age if max_age is None else max_age
+        if self.known_ids is not None and job_id not in self.known_ids:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, fetched_at, posted_at, fetches, changes FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        now = time.time()
+        if row is None:
+            stale = True
+        elif self.refresh_policy is not None:
+            stale = self.refresh_policy.due(now, *row[1:])
+        else:
+            stale = max_age is not None and now - row[1] > max_age
+        with self._lock:
+            if stale:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def __contains__(self, job_id):
+        if self.known_ids is not None:
+            return job_id in self.known_ids
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone() is not None
+
+    def put(self, job_post, fetched_at=None):
+        # Refetches count towards the job's history of volatile field changes
+        data = json.dumps(job_post, ensure_ascii=False)
+        fetched_at = fetched_at or time.time()
+        posted = posted_at(job_post.get("time_posted"), fetched_at)
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT data, posted_at, fetches, changes FROM jobs WHERE job_id = ?", (job_post["job_id"],)
+            ).fetchone()
+            fetches, changes = 1, 0
+            if old is not None:
+                fetches = old[2] + 1
+                changes = old[3] + volatile_changed(json.loads(old[0]), job_post, old[1], posted)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, data, fetched_at, posted_at, fetches, changes)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_post["job_id"], data, fetched_at, posted, fetches, changes)
+            )
+            self._conn.commit()
+
+    def record_query_hits(self, alias, location, job_ids, seen_at=None):
+        seen_at = seen_at or time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO query_hits (alias, location, job_id, seen_at) VALUES (?, ?, ?, ?)",
+                [(alias, location, job_id, seen_at) for job_id in job_ids]
+            )
+            self._conn.commit()
+
+    def record_query_run(self, alias, location, run_at=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_runs (alias, location, last_run) VALUES (?, ?, ?)",
+                (alias, location, run_at or time.time())
+            )
+            self._conn.commit()
+
+    def query_history(self, since):
+        # Returns ({(alias, location): set of job ids seen since `since`}, {(alias, location): last run})
+        with self._lock:
+            self._conn.execute("DELETE FROM query_hits WHERE seen_at < ?", (since,))
+            self._conn.commit()
+            hits = self._conn.execute("SELECT alias, location, job_id FROM query_hits").fetchall()
+            runs = self._conn.execute("SELECT alias, location, last_run FROM query_runs").fetchall()
+        history = {}
+        for alias, location, job_id in hits:
+            history.setdefault((alias, location), set()).add(job_id)
+        return history, {(alias, location): last_run for alias, location, last_run in runs}
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def stats(self):
+        return {"jobs": len(self), "served_from_store": self.hits, "fetched": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
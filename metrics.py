@@ -0,0 +1,120 @@
+import json
+from bisect import bisect_left
+from threading import Lock
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DEPTH_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+METRIC_PREFIX = "linkedin_scraper_"
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Histogram:
+    # Fixed-bucket histogram; counts[i] holds observations <= buckets[i], the last
+    # slot everything above the largest bucket
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "buckets": {str(bound): count for bound, count in zip((*self.buckets, "+Inf"), self.counts)}
+        }
+
+
+class Metrics:
+    # Thread-safe registry of counters, histograms and gauges, each keyed by name and
+    # labels. Gauges keep their last and highest value.
+    def __init__(self):
+        self._lock = Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def set_gauge(self, name, value, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            _, highest = self.gauges.get(key, (value, value))
+            self.gauges[key] = (value, max(highest, value))
+
+    def total(self, name, **labels):
+        # Sum of a counter over every label set that includes `labels`
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(value for (counter, key), value in self.counters.items()
+                       if counter == name and wanted <= set(key))
+
+    def report(self):
+        with self._lock:
+            counters = {}
+            for (name, key), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({"labels": dict(key), "value": value})
+            histograms = {}
+            for (name, key), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                histograms.setdefault(name, []).append({"labels": dict(key), **histogram.to_dict()})
+            gauges = {}
+            for (name, key), (last, highest) in sorted(self.gauges.items()):
+                gauges.setdefault(name, []).append({"labels": dict(key), "last": last, "max": highest})
+        return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def to_prometheus(self):
+        # Prometheus text exposition format, for a node_exporter textfile collector or a pushgateway
+        def escape(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+        def labels_text(labels, **extra):
+            items = [*labels, *extra.items()]
+            if not items:
+                return ""
+            return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in items) + "}"
+
+        lines = []
+        with self._lock:
+            for kind, entries in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted({name for name, _ in entries}):
+                    lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+                    for (entry_name, key), value in sorted(entries.items()):
+                        if entry_name == name:
+                            value = value[0] if kind == "gauge" else value
+                            lines.append(f"{METRIC_PREFIX}{name}{labels_text(key)} {value}")
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} histogram")
+                for (entry_name, key), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if entry_name != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                        cumulative += count
+                        lines.append(f"{METRIC_PREFIX}{name}_bucket{labels_text(key, le=bound)} {cumulative}")
+                    lines.append(f"{METRIC_PREFIX}{name}_sum{labels_text(key)} {histogram.sum}")
+                    lines.append(f"{METRIC_PREFIX}{name}_count{labels_text(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def write_report(path, report):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
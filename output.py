@@ -0,0 +1,170 @@
+import csv
+import json
+import os
+from threading import Lock
+
+from parsers import CARD_FIELDS, DETAIL_FIELDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+LISTING_FIELDS = ("job_id", "original_category", "search_location", "search_term_used")
+OUTPUT_FIELDS = (*LISTING_FIELDS, *DETAIL_FIELDS, "job_url", "posted_date")
+# What a listing card alone provides, for --summary runs
+SUMMARY_FIELDS = tuple(field for field in OUTPUT_FIELDS if field in (*LISTING_FIELDS, *CARD_FIELDS, "job_url"))
+OUTPUT_FORMAT = "csv"
+# Low-cardinality columns stored as dictionary indexes in Parquet output
+DICTIONARY_FIELDS = ("original_category", "search_location", "employment_type", "job_level")
+PARQUET_ROW_GROUP_SIZE = 1000
+
+
+class RowWriter:
+    # Appends rows to the output file as they complete. Every row is flushed on its own,
+    # so only the current row is ever held in memory and an interrupted run still leaves
+    # a readable file of everything finished so far.
+    extension = None
+
+    def __init__(self, path, fields=OUTPUT_FIELDS):
+        self.path = path
+        self.fields = tuple(fields)
+        self.rows = 0
+        self._lock = Lock()
+        self._file = self._open()
+
+    def _open(self):
+        return open(self.path, "w", newline="", encoding="utf-8")
+
+    def _write(self, row):
+        raise NotImplementedError
+
+    def write(self, row):
+        with self._lock:
+            self._write(row)
+            self._file.flush()
+            self.rows += 1
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class CsvWriter(RowWriter):
+    extension = "csv"
+
+    def _open(self):
+        f = super()._open()
+        self._writer = csv.DictWriter(f, fieldnames=self.fields, extrasaction="ignore")
+        self._writer.writeheader()
+        f.flush()
+        return f
+
+    def _write(self, row):
+        self._writer.writerow(row)
+
+
+class JsonLinesWriter(RowWriter):
+    extension = "jsonl"
+
+    def _write(self, row):
+        self._file.write(json.dumps({field: row.get(field) for field in self.fields}, ensure_ascii=False) + "\n")
+
+
+def parquet_schema(fields=OUTPUT_FIELDS):
+    # Every scraped field is text as shown on the page (e.g. "Over 200 applicants"),
+    # so the columns are strings; the repeated ones are dictionary encoded.
+    return pa.schema([
+        pa.field(field, pa.dictionary(pa.int32(), pa.string()) if field in DICTIONARY_FIELDS else pa.string(),
+                 nullable=field != "job_id")
+        for field in fields
+    ])
+
+
+class ParquetWriter(RowWriter):
+    # Buffers up to `row_group_size` rows and writes each batch as its own row group.
+    # Unlike CSV/JSONL the file has no footer until close(), so an interrupted run
+    # leaves it unreadable; the checkpoint still has every finished row.
+    extension = "parquet"
+
+    def __init__(self, path, fields=OUTPUT_FIELDS, row_group_size=PARQUET_ROW_GROUP_SIZE):
+        self.row_group_size = row_group_size
+        self._buffer = []
+        super().__init__(path, fields)
+
+    def _open(self):
+        self.schema = parquet_schema(self.fields)
+        return pq.ParquetWriter(
+            self.path, self.schema, compression="zstd",
+            use_dictionary=[field for field in self.fields if field in DICTIONARY_FIELDS]
+        )
+
+    def _write(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        if self._buffer:
+            columns = {field: [row.get(field) for row in self._buffer] for field in self.fields}
+            self._file.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+            self._buffer = []
+
+    def write(self, row):
+        with self._lock:
+            self._write(row)
+            self.rows += 1
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._write_row_group()
+                self._file.close()
+                self._file = None
+
+
+OUTPUT_FORMATS = {"csv": CsvWriter, "jsonl": JsonLinesWriter}
+if pa is not None:
+    OUTPUT_FORMATS["parquet"] = ParquetWriter
+
+
+def format_of(path):
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{extension}' (supported: {', '.join(OUTPUT_FORMATS)})")
+    return extension
+
+
+def open_writer(path, fields=OUTPUT_FIELDS):
+    return OUTPUT_FORMATS[format_of(path)](path, fields)
+
+
+def read_rows(path, fieldnames=None):
+    # Streams rows back from an output file in any supported format; fieldnames, if
+    # given, collects the columns seen in file order.
+    if format_of(path) == "parquet":
+        parquet_file = pq.ParquetFile(path)
+        if fieldnames is not None:
+            fieldnames.extend(name for name in parquet_file.schema_arrow.names if name not in fieldnames)
+        for batch in parquet_file.iter_batches():
+            yield from batch.to_pylist()
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        if format_of(path) == "csv":
+            reader = csv.DictReader(f)
+            if fieldnames is not None:
+                fieldnames.extend(name for name in reader.fieldnames or () if name not in fieldnames)
+            yield from reader
+            return
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                # Last line cut short by an interrupted run
+                continue
+            if fieldnames is not None:
+                fieldnames.extend(name for name in row if name not in fieldnames)
+            yield row
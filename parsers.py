@@ -0,0 +1,290 @@
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+DETAIL_FIELDS = (
+    "job_title", "company_name", "company_url", "location", "time_posted",
+    "num_applicants", "employment_type", "job_level", "job_description"
+)
+
+# (tag, class, field) for every element the job page parser reads; the first match
+# in document order wins, except criteria which are collected in order.
+JOB_PAGE_RULES = (
+    ("h1", "top-card-layout__title", "job_title"),
+    ("a", "topcard__org-name-link", "company"),
+    ("span", "topcard__flavor--bullet", "location"),
+    ("span", "posted-time-ago__text", "time_posted"),
+    ("span", "num-applicants__caption", "num_applicants"),
+    ("span", "description__job-criteria-text", "criteria"),
+    ("div", "show-more-less-html__markup", "job_description"),
+)
+# The guest jobPosting fragment carries the same top card and description without
+# the page chrome; its title is an h2 and the applicant count may be a figcaption.
+JOB_FRAGMENT_RULES = (
+    ("h2", "top-card-layout__title", "job_title"),
+    *JOB_PAGE_RULES[1:],
+    ("figcaption", "num-applicants__caption", "num_applicants"),
+)
+CRITERIA_FIELDS = ("employment_type", "job_level")
+# (tag, classes, field, attribute) read from each listing card: the first element with
+# any of the classes; attribute None means the element's text. posted_date is the
+# card's machine-readable date. Same-day postings are often marked only --new.
+LISTDATE_CLASSES = ("job-search-card__listdate", "job-search-card__listdate--new")
+CARD_RULES = (
+    ("h3", ("base-search-card__title",), "job_title", None),
+    ("h4", ("base-search-card__subtitle",), "company_name", None),
+    ("a", ("hidden-nested-link",), "company_url", "href"),
+    ("span", ("job-search-card__location",), "location", None),
+    ("time", LISTDATE_CLASSES, "time_posted", None),
+    ("time", LISTDATE_CLASSES, "posted_date", "datetime"),
+)
+CARD_FIELDS = tuple(field for _, _, field, _ in CARD_RULES)
+# What only the job page (or fragment) provides; a row with any of them has been fetched
+PAGE_FIELDS = tuple(field for field in DETAIL_FIELDS if field not in CARD_FIELDS)
+
+
+def job_id_from_urn(urn):
+    return urn.split(":")[-1]
+
+
+def empty_details():
+    return dict.fromkeys(DETAIL_FIELDS)
+
+
+def apply_job_page_matches(matches):
+    # matches: (field, text_getter, href_getter) in document order
+    details = empty_details()
+    criteria = []
+    for field, get_text, get_href in matches:
+        if field == "criteria":
+            if len(criteria) < len(CRITERIA_FIELDS):
+                criteria.append(get_text())
+        elif field == "company":
+            if details["company_name"] is None:
+                details["company_name"] = get_text()
+                details["company_url"] = get_href()
+        elif details[field] is None:
+            details[field] = get_text()
+    details.update(zip(CRITERIA_FIELDS, criteria))
+    return details
+
+
+class SoupParser:
+    # Reference implementation on BeautifulSoup's pure-Python html.parser
+    name = "bs4"
+
+    def parse_card(self, base_card):
+        card = {"job_id": job_id_from_urn(base_card.get("data-entity-urn", ""))}
+        for tag, css_classes, field, attribute in CARD_RULES:
+            element = base_card.find(tag, class_=list(css_classes))
+            if element is None:
+                card[field] = None
+            else:
+                card[field] = element.get(attribute) if attribute else element.get_text(strip=True)
+        return card
+
+    def parse_listing(self, html):
+        soup = BeautifulSoup(html, "html.parser")
+        jobs = soup.find_all("li")
+        if not jobs:
+            return None
+
+        cards = []
+        for job in jobs:
+            base_card = job.find("div", class_="base-card")
+            if not base_card:
+                continue
+            cards.append(self.parse_card(base_card))
+        return cards
+
+    def parse_job(self, html):
+        return self._parse_job(html, JOB_PAGE_RULES)
+
+    def parse_fragment(self, html):
+        return self._parse_job(html, JOB_FRAGMENT_RULES)
+
+    def _parse_job(self, html, rules):
+        soup = BeautifulSoup(html, "html.parser")
+        matches = []
+        for tag, css_class, field in rules:
+            if field == "criteria":
+                elements = soup.find_all(tag, {"class": css_class}, limit=len(CRITERIA_FIELDS))
+            else:
+                element = soup.find(tag, {"class": css_class})
+                elements = [element] if element else []
+            for element in elements:
+                matches.append((
+                    field,
+                    lambda element=element: element.get_text(strip=True),
+                    lambda element=element: element.get("href", "")
+                ))
+        return apply_job_page_matches(matches)
+
+
+def _has_class(css_class):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')"
+
+
+class LxmlParser:
+    # libxml2-backed parser; all job page fields come from one precompiled XPath
+    # traversal whose hits are then dispatched by tag and class in document order.
+    name = "lxml"
+
+    def __init__(self):
+        self._listing_items = etree.XPath("//li")
+        self._base_card = etree.XPath(f"descendant::div[{_has_class('base-card')}][1]")
+        self._job_page = self._job_matcher(JOB_PAGE_RULES)
+        self._job_fragment = self._job_matcher(JOB_FRAGMENT_RULES)
+        self._card_rules = [
+            (etree.XPath(f"descendant::{tag}[{' or '.join(map(_has_class, css_classes))}][1]"), field, attribute)
+            for tag, css_classes, field, attribute in CARD_RULES
+        ]
+
+    @staticmethod
+    def _job_matcher(rules):
+        nodes = etree.XPath("//*[" + " or ".join(
+            f"(self::{tag} and {_has_class(css_class)})" for tag, css_class, _ in rules
+        ) + "]")
+        return nodes, {(tag, css_class): field for tag, css_class, field in rules}
+
+    @staticmethod
+    def _text(element):
+        return "".join(text.strip() for text in element.itertext())
+
+    def _document(self, html):
+        if not html or not html.strip():
+            return None
+        return lxml.html.fromstring(html)
+
+    def parse_listing(self, html):
+        document = self._document(html)
+        items = self._listing_items(document) if document is not None else []
+        if not items:
+            return None
+
+        cards = []
+        for item in items:
+            base_card = self._base_card(item)
+            if not base_card:
+                continue
+            cards.append(self.parse_card(base_card[0]))
+        return cards
+
+    def parse_card(self, base_card):
+        card = {"job_id": job_id_from_urn(base_card.get("data-entity-urn", ""))}
+        for find, field, attribute in self._card_rules:
+            element = find(base_card)
+            if not element:
+                card[field] = None
+            else:
+                card[field] = element[0].get(attribute) if attribute else self._text(element[0])
+        return card
+
+    def parse_job(self, html):
+        return self._parse_job(html, *self._job_page)
+
+    def parse_fragment(self, html):
+        return self._parse_job(html, *self._job_fragment)
+
+    def _parse_job(self, html, job_nodes, rules):
+        document = self._document(html)
+        if document is None:
+            return empty_details()
+
+        matches = []
+        for element in job_nodes(document):
+            classes = element.get("class", "").split()
+            for css_class in classes:
+                field = rules.get((element.tag, css_class))
+                if field:
+                    matches.append((
+                        field,
+                        lambda element=element: self._text(element),
+                        lambda element=element: element.get("href", "")
+                    ))
+        return apply_job_page_matches(matches)
+
+
+class SelectolaxParser:
+    # Lexbor (C) parser; one combined CSS selector, results come back in document order
+    name = "selectolax"
+
+    def __init__(self):
+        self._job_page = self._job_matcher(JOB_PAGE_RULES)
+        self._job_fragment = self._job_matcher(JOB_FRAGMENT_RULES)
+
+    @staticmethod
+    def _job_matcher(rules):
+        selector = ", ".join(f"{tag}.{css_class}" for tag, css_class, _ in rules)
+        return selector, {(tag, css_class): field for tag, css_class, field in rules}
+
+    def parse_listing(self, html):
+        tree = LexborHTMLParser(html or "")
+        items = tree.css("li")
+        if not items:
+            return None
+
+        cards = []
+        for item in items:
+            base_card = item.css_first("div.base-card")
+            if base_card is None:
+                continue
+            cards.append(self.parse_card(base_card))
+        return cards
+
+    def parse_card(self, base_card):
+        card = {"job_id": job_id_from_urn(base_card.attributes.get("data-entity-urn") or "")}
+        for tag, css_classes, field, attribute in CARD_RULES:
+            node = base_card.css_first(", ".join(f"{tag}.{css_class}" for css_class in css_classes))
+            if node is None:
+                card[field] = None
+            else:
+                card[field] = node.attributes.get(attribute) if attribute else node.text(deep=True, strip=True)
+        return card
+
+    def parse_job(self, html):
+        return self._parse_job(html, *self._job_page)
+
+    def parse_fragment(self, html):
+        return self._parse_job(html, *self._job_fragment)
+
+    def _parse_job(self, html, selector, rules):
+        tree = LexborHTMLParser(html or "")
+        matches = []
+        for node in tree.css(selector):
+            classes = (node.attributes.get("class") or "").split()
+            for css_class in classes:
+                field = rules.get((node.tag, css_class))
+                if field:
+                    matches.append((
+                        field,
+                        lambda node=node: node.text(deep=True, strip=True),
+                        lambda node=node: node.attributes.get("href") or ""
+                    ))
+        return apply_job_page_matches(matches)
+
+
+PARSERS = {"bs4": SoupParser}
+if lxml is not None:
+    PARSERS["lxml"] = LxmlParser
+if LexborHTMLParser is not None:
+    PARSERS["selectolax"] = SelectolaxParser
+
+
+def get_parser(name="auto"):
+    if name == "auto":
+        for candidate in ("selectolax", "lxml", "bs4"):
+            if candidate in PARSERS:
+                return PARSERS[candidate]()
+    if name not in PARSERS:
+        raise ValueError(f"Parser backend '{name}' is not available (installed: {', '.join(PARSERS)})")
+    return PARSERS[name]()
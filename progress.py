@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import deque
+
+PROGRESS_INTERVAL = 10
+# Rates are measured over this trailing window, so a stall shows up within a minute
+PROGRESS_WINDOW = 60
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class Stage:
+    # One segment of the progress line. sample() returns (done, remaining, errors,
+    # attempts, in_flight): work units finished and left, failed out of attempted,
+    # and requests currently in flight for the stage.
+    def __init__(self, name, unit, sample, window=PROGRESS_WINDOW):
+        self.name = name
+        self.unit = unit
+        self.sample = sample
+        self.window = window
+        self._history = deque()
+
+    def line(self, now):
+        done, remaining, errors, attempts, in_flight = self.sample()
+        self._history.append((now, done))
+        while len(self._history) > 2 and now - self._history[1][0] >= self.window:
+            self._history.popleft()
+        since, done_since = self._history[0]
+        rate = (done - done_since) / (now - since) if now > since else 0.0
+        if not remaining:
+            eta = "done"
+        else:
+            eta = format_duration(remaining / rate) if rate else "stalled"
+        error_rate = errors / attempts if attempts else 0.0
+        return (f"{self.name}: {done} {self.unit} done, {remaining} left, {rate:.1f} {self.unit}/s, "
+                f"ETA {eta}, {in_flight} in flight, {error_rate:.1%} errors")
+
+
+class ProgressReporter:
+    # Prints one progress line for all stages every `interval` seconds from a daemon
+    # thread; stages only sample counters the workers already keep.
+    def __init__(self, stages, interval=PROGRESS_INTERVAL):
+        self.stages = list(stages)
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def report(self):
+        now = time.monotonic()
+        print("Progress | " + " | ".join(stage.line(now) for stage in self.stages), flush=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.report()
+
+    def start(self):
+        now = time.monotonic()
+        for stage in self.stages:
+            stage.line(now)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self.report()
@@ -0,0 +1,67 @@
+import time
+
+PLANNER_HISTORY_DAYS = 14
+PLANNER_MIN_MARGINAL = 0.05
+PLANNER_REPROBE_DAYS = 7
+# LinkedIn returns this many cards per listing page
+PLANNER_PAGE_SIZE = 25
+
+
+class QueryPlanner:
+    # Orders alias x location queries by the job ids they returned in previous runs.
+    # Within each category it greedily picks the query covering the most ids not yet
+    # covered; a query whose marginal share of new ids is below min_marginal is
+    # skipped as redundant, unless it has not been run for reprobe_days. After plan(),
+    # expected_yield holds each planned query's new ids per listing request.
+    def __init__(self, store, history_days=PLANNER_HISTORY_DAYS, min_marginal=PLANNER_MIN_MARGINAL,
+                 reprobe_days=PLANNER_REPROBE_DAYS):
+        self.store = store
+        self.history_days = history_days
+        self.min_marginal = min_marginal
+        self.reprobe_days = reprobe_days
+        self.skipped = []
+        self.expected_yield = {}
+
+    def default_yield(self):
+        # Prior for queries without history: the mean of the known ones
+        if not self.expected_yield:
+            return 1.0
+        return sum(self.expected_yield.values()) / len(self.expected_yield)
+
+    def plan(self, queries):
+        # queries: (alias, category, location, ...) tuples; returns the ones to run,
+        # highest expected yield first, with queries never run before at the front
+        now = time.time()
+        history, last_runs = self.store.query_history(now - self.history_days * 86400)
+        self.skipped = []
+        self.expected_yield = {}
+
+        by_category = {}
+        for order, query in enumerate(queries):
+            by_category.setdefault(query[1], []).append((order, query))
+
+        scheduled = []
+        for category_queries in by_category.values():
+            known = [(order, query) for order, query in category_queries if (query[0], query[2]) in last_runs]
+            unknown = [(order, query) for order, query in category_queries if (query[0], query[2]) not in last_runs]
+            scheduled.extend((float("inf"), order, query) for order, query in unknown)
+
+            covered = set()
+            while known:
+                best = max(known, key=lambda item: len(history.get((item[1][0], item[1][2]), set()) - covered))
+                known.remove(best)
+                order, query = best
+                key = (query[0], query[2])
+                job_ids = history.get(key, set())
+                gain = len(job_ids - covered)
+                covered |= job_ids
+                marginal = gain / len(job_ids) if job_ids else 0.0
+                stale = now - last_runs[key] > self.reprobe_days * 86400
+                if marginal < self.min_marginal and not stale:
+                    self.skipped.append(query)
+                else:
+                    scheduled.append((gain, order, query))
+                    self.expected_yield[key] = gain / max(1, -(-len(job_ids) // PLANNER_PAGE_SIZE))
+
+        scheduled.sort(key=lambda item: (-item[0], item[1]))
+        return [query for _, _, query in scheduled]
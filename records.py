@@ -0,0 +1,41 @@
+import sys
+
+from output import LISTING_FIELDS, OUTPUT_FIELDS
+
+SCRAPED_FIELDS = tuple(field for field in OUTPUT_FIELDS if field not in LISTING_FIELDS)
+
+
+class JobRecord:
+    # One job row from the listing card to the output writer. Slots instead of a dict
+    # per row, and the repeated search context strings are interned, so rows rebuilt
+    # from checkpoints or listing files share one copy of each. get() lets the
+    # writers treat it like the dict rows they read back from files.
+    __slots__ = OUTPUT_FIELDS
+
+    def __init__(self, job_id, original_category, search_location, search_term_used, **scraped):
+        self.job_id = job_id
+        self.original_category = sys.intern(original_category)
+        self.search_location = sys.intern(search_location)
+        self.search_term_used = sys.intern(search_term_used)
+        for field in SCRAPED_FIELDS:
+            setattr(self, field, scraped.get(field))
+
+    @classmethod
+    def from_dict(cls, row):
+        return cls(**{field: row.get(field) for field in OUTPUT_FIELDS})
+
+    def get(self, field, default=None):
+        return getattr(self, field, default)
+
+    def update(self, scraped):
+        # Only scraped fields that have a value, so a job page missing a field keeps what
+        # the listing card had; the search context stays the one this run found it under
+        for field in SCRAPED_FIELDS:
+            if scraped.get(field) is not None:
+                setattr(self, field, scraped[field])
+
+    def to_dict(self, fields=OUTPUT_FIELDS):
+        return {field: getattr(self, field) for field in fields}
+
+    def __repr__(self):
+        return f"JobRecord({self.job_id!r}, {self.original_category!r}, {self.search_location!r})"
@@ -0,0 +1,66 @@
+import re
+from threading import Lock
+
+# Fields that keep changing after a job is posted; everything else is fixed
+VOLATILE_FIELDS = ("num_applicants", "time_posted")
+TIME_POSTED_RE = re.compile(r"(\d+)\s+(minute|hour|day|week|month|year)s?\s+ago", re.IGNORECASE)
+TIME_POSTED_UNITS = {
+    "minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400
+}
+REFRESH_MIN_INTERVAL = 86400
+# A posting is refetched after this share of its age: a day-old job after ~12 hours
+# (clamped to the minimum), a month-old one after ~15 days
+REFRESH_AGE_FACTOR = 0.5
+# Repost detection: an estimated posting date that moves by more than this is a change
+REPOST_TOLERANCE = 2 * 86400
+
+
+def posted_at(time_posted, fetched_at):
+    # "3 days ago" on a page fetched at `fetched_at` -> estimated posting timestamp
+    match = TIME_POSTED_RE.search(time_posted or "")
+    if not match:
+        return None
+    return fetched_at - int(match.group(1)) * TIME_POSTED_UNITS[match.group(2).lower()]
+
+
+def volatile_changed(old, new, old_posted_at, new_posted_at):
+    # time_posted text changes every day on its own, so it only counts as a change
+    # when the posting date it implies moved, i.e. the job was reposted
+    if (old.get("num_applicants") or None) != (new.get("num_applicants") or None):
+        return True
+    if old_posted_at is not None and new_posted_at is not None:
+        return abs(new_posted_at - old_posted_at) > REPOST_TOLERANCE
+    return False
+
+
+class RefreshPolicy:
+    # Decides per stored job whether its details are due for a refetch. The interval
+    # grows with the posting's age and shrinks for jobs whose volatile fields changed
+    # on most previous refetches; (changes + 1) / (fetches + 1) smooths the change
+    # rate so a job fetched once starts at the plain age-based interval.
+    def __init__(self, min_interval=REFRESH_MIN_INTERVAL, max_interval=7 * 86400, age_factor=REFRESH_AGE_FACTOR):
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max_interval
+        self.age_factor = age_factor
+        self._lock = Lock()
+        self.refetched = 0
+        self.reused = 0
+
+    def interval(self, fetched_at, posted_at, fetches, changes):
+        age = fetched_at - posted_at if posted_at is not None else self.max_interval / self.age_factor
+        change_rate = (changes + 1) / (fetches + 1)
+        interval = age * self.age_factor * 0.5 / change_rate
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def due(self, now, fetched_at, posted_at, fetches, changes):
+        due = now - fetched_at >= self.interval(fetched_at, posted_at, fetches, changes)
+        with self._lock:
+            if due:
+                self.refetched += 1
+            else:
+                self.reused += 1
+        return due
+
+    def stats(self):
+        with self._lock:
+            return {"refetched": self.refetched, "reused": self.reused}
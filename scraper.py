@@ -1,13 +1,30 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
 import random
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import argparse
+import heapq
+import queue
+import time
+import re
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from urllib.parse import quote
 from datetime import datetime
 import warnings
 from threading import Lock
+from http_client import ACCEPT_ENCODINGS, Fetcher, OutOfTime, RateLimiter
+from metrics import DEPTH_BUCKETS, Metrics, write_report
+from http_cache import CACHE_MAX_BYTES, CACHE_PATH, ResponseCache
+from job_store import JobStore, STORE_PATH
+from checkpoint import Checkpoint, CHECKPOINT_DIR, CHECKPOINT_MAX_AGE
+from dedup import ShardedIdSet
+from parsers import CARD_FIELDS, PAGE_FIELDS, PARSERS, get_parser
+from progress import PROGRESS_INTERVAL, ProgressReporter, Stage
+from query_planner import QueryPlanner
+from refresh_policy import RefreshPolicy
+from output import OUTPUT_FIELDS, OUTPUT_FORMAT, OUTPUT_FORMATS, LISTING_FIELDS, SUMMARY_FIELDS, open_writer, read_rows
+from records import JobRecord
+from sharding import Shard, merge_outputs
 
 warnings.filterwarnings('ignore')
 
@@ -22,10 +39,56 @@ JOB_CATEGORIES = [
 ]
 
 LOCATIONS = ["Morocco", "Europe", "Middle East", "USA", "Canada"]
+LINKEDIN_BASE_URL = "https://www.linkedin.com"
 MAX_RESULTS_PER_QUERY = 1000
 RESULTS_PER_PAGE = 25
+PAGINATION_WINDOW = 3
+PAGINATION_MIN_NEW_PER_PAGE = 1
+RESULT_COUNT_RE = re.compile(r'results-context-header__job-count[^>]*>\s*([^<]+)<')
 MAX_THREADS = 5
-DELAY_RANGE = (1, 3)
+ASYNC_CONCURRENCY = 50
+DETAIL_QUEUE_SIZE = 500
+STORE_MAX_AGE_DAYS = 7
+RETRY_MAX_ATTEMPTS = 4
+RETRY_BASE_DELAY = 30
+CHECKPOINT_INTERVAL = 60
+# A --deadline run requests listing pages for this share of its budget and detail
+# pages until DEADLINE_FLUSH_SECONDS before the end, which are left for writing the
+# jobs it never got to from their listing cards
+DEADLINE_LISTING_SHARE = 0.7
+DEADLINE_FLUSH_SECONDS = 60
+# Category -> weight for ordering a --deadline run; unlisted categories weigh 1
+CATEGORY_WEIGHTS = {}
+PARSER_BACKEND = "auto"
+PARSE_WORKERS = 0
+# A --summary row is written from its listing card unless the card lacks one of these
+SUMMARY_REQUIRED_FIELDS = ("job_title", "company_name", "location", "time_posted")
+# "page" reads details from the full /jobs/view/ page; "fragment" from the guest
+# jobPosting fragment (~5 KB instead of ~120 KB), falling back to the full page for
+# jobs whose fragment lacks one of FRAGMENT_REQUIRED_FIELDS
+DETAIL_SOURCE = "page"
+DETAIL_SOURCES = ("page", "fragment")
+FRAGMENT_REQUIRED_FIELDS = ("job_title", "company_name", "location", "job_description")
+URL_KINDS = (
+    ("/jobs-guest/jobs/api/seeMoreJobPostings/", "listing"),
+    ("/jobs-guest/jobs/api/jobPosting/", "fragment"),
+    ("/jobs/view/", "job"),
+)
+# (url substring, markers) for the fetcher: everything the job page parser reads comes
+# before the end of the criteria list, so the footer and related jobs after it are
+# never downloaded. Listing pages and fragments are read in full.
+STOP_MARKERS = (
+    ("/jobs/view/", ('class="description__job-criteria-list"', "</ul>")),
+)
+METRICS_PATH = "run_metrics.json"
+WRITE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+# (url substring, seconds) for the response cache: listing results move quickly,
+# a job's own page rarely changes once posted
+CACHE_TTLS = (
+    ("/jobs-guest/jobs/api/seeMoreJobPostings/", 30 * 60),
+    ("/jobs-guest/jobs/api/jobPosting/", 3 * 86400),
+    ("/jobs/view/", 3 * 86400),
+)
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -37,168 +100,1121 @@ def get_random_headers():
         "User-Agent": random.choice(USER_AGENTS),
         "Accept-Language": "en-US,en;q=0.9",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Encoding": ACCEPT_ENCODINGS,
         "Referer": "https://www.google.com/"
     }
 
-def scrape_job_listings(search_term, original_category, location, seen_job_ids_local):
+rate_limiter = RateLimiter()
+metrics = Metrics()
+fetcher = Fetcher(headers_factory=get_random_headers, limiter=rate_limiter, metrics=metrics, url_kinds=URL_KINDS,
+                  stop_markers=STOP_MARKERS)
+page_parser = get_parser(PARSER_BACKEND)
+job_detail_source = DETAIL_SOURCE
+
+def print_fetch_stats():
+    stats = fetcher.stats()
+    print(f"HTTP requests: {stats['requests']} over {stats['sessions']} sessions, "
+          f"connections opened: {stats['connections_opened']}, reused: {stats['connections_reused']}")
+    total = stats["fetch_seconds"] + parse_timer.seconds
+    if total:
+        print(f"Time split: fetching {stats['fetch_seconds']:.1f}s ({stats['fetch_seconds'] / total:.0%}), "
+              f"parsing {parse_timer.seconds:.1f}s ({parse_timer.seconds / total:.0%}) over {parse_timer.count} pages")
+    limiter_stats = rate_limiter.metrics()
+    rates = ", ".join(f"{host} {rate} req/s" for host, rate in limiter_stats["rates"].items())
+    print(f"Rate limiter: {rates or 'no requests'}; {limiter_stats['throttle_events']} throttled, "
+          f"{limiter_stats['error_events']} errors, {limiter_stats['slow_responses']} slow responses, "
+          f"{limiter_stats['waited_seconds']}s spent waiting")
+    if fetcher.cache is not None:
+        cache = fetcher.cache.stats()
+        print(f"Response cache: {cache['hit_rate']:.0%} hit rate ({cache['hits']} fresh, {cache['revalidated']} revalidated, "
+              f"{cache['misses']} misses), {cache['bytes_saved'] / 2 ** 20:.1f} MB not downloaded; "
+              f"{cache['entries']} entries, {cache['stored_bytes'] / 2 ** 20:.1f} MB stored, {cache['evicted']} evicted")
+
+def listing_url(search_term, location, start):
+    return f"{LINKEDIN_BASE_URL}/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={quote(search_term)}&location={quote(location)}&start={start}"
+
+def job_view_url(job_id):
+    return f"{LINKEDIN_BASE_URL}/jobs/view/{job_id}"
+
+def job_fragment_url(job_id):
+    return f"{LINKEDIN_BASE_URL}/jobs-guest/jobs/api/jobPosting/{job_id}"
+
+class StageTimer:
+    def __init__(self):
+        self._lock = Lock()
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+
+parse_timer = StageTimer()
+parse_pool = None
+
+def init_parse_worker(backend):
+    global page_parser
+    page_parser = get_parser(backend)
+
+def parse_page(kind, html):
+    # Top-level so it can run in a parse_pool worker process; returns (result, seconds)
+    started = time.perf_counter()
+    if kind == "listing":
+        result = page_parser.parse_listing(html)
+    elif kind == "fragment":
+        result = page_parser.parse_fragment(html)
+    else:
+        result = page_parser.parse_job(html)
+    return result, time.perf_counter() - started
+
+def run_parse(kind, html):
+    if parse_pool is not None:
+        result, seconds = parse_pool.submit(parse_page, kind, html).result()
+    else:
+        result, seconds = parse_page(kind, html)
+    parse_timer.add(seconds)
+    metrics.observe("parse_seconds", seconds, kind=kind)
+    return result
+
+async def run_parse_async(kind, html, executor):
+    result, seconds = await asyncio.get_running_loop().run_in_executor(parse_pool or executor, parse_page, kind, html)
+    parse_timer.add(seconds)
+    metrics.observe("parse_seconds", seconds, kind=kind)
+    return result
+
+def parse_job_listings(html, search_term, original_category, location, seen_job_ids_local, known_ids=None, page_ids=None):
+    return build_job_listings(run_parse("listing", html), search_term, original_category, location,
+                              seen_job_ids_local, known_ids, page_ids)
+
+def build_job_listings(cards, search_term, original_category, location, seen_job_ids_local, known_ids=None, page_ids=None):
+    # Returns None for an empty page (end of results), else the new listings on it.
+    # Ids already in known_ids (the run-wide set) are dropped here, before any record
+    # is built; page_ids, if given, still collects every id the page returned.
+    if cards is None:
+        return None
+
+    job_listings = []
+    for card in cards:
+        job_id = card["job_id"]
+        if not job_id or job_id in seen_job_ids_local:
+            continue
+
+        seen_job_ids_local.add(job_id)
+        if page_ids is not None:
+            page_ids.append(job_id)
+        if known_ids is not None and job_id in known_ids:
+            continue
+        job_listings.append(JobRecord(
+            job_id, original_category, location, search_term,
+            job_url=job_view_url(job_id), **{field: card.get(field) for field in CARD_FIELDS}
+        ))
+
+    return job_listings
+
+def new_job_post(job):
+    # Card fields stay as they are; the job page only fills in or overrides them
+    job.job_url = job_view_url(job.job_id)
+    return job
+
+def parse_job_details(html, job_post):
+    job_post.update(run_parse("job", html))
+    return job_post
+
+def fragment_complete(job_post, details, response):
+    # Fills job_post from a fragment that has every required field; one that failed
+    # or lacks a field is retried as the full page
+    if response.status_code == 200 and all(details.get(field) for field in FRAGMENT_REQUIRED_FIELDS):
+        job_post.update(details)
+        return True
+    metrics.inc("detail_fragment_fallbacks_total")
+    return False
+
+def job_page_fetched(job, response):
+    if response.status_code == 200:
+        return True
+    print(f"Failed to fetch job {job.job_id}: HTTP {response.status_code}")
+    return False
+
+def parse_result_count(html):
+    match = RESULT_COUNT_RE.search(html)
+    if not match:
+        return None
+    digits = re.sub(r"\D", "", match.group(1))
+    return int(digits) if digits else None
+
+class PaginationController:
+    # Decides when a query has stopped paying off: once LinkedIn's reported result
+    # count is exhausted, or when the last `window` pages together brought fewer than
+    # `min_new_per_page` globally new job ids per page. A --deadline run also stops
+    # every query once its listing time is up.
+    def __init__(self, window=PAGINATION_WINDOW, min_new_per_page=PAGINATION_MIN_NEW_PER_PAGE, deadline=None):
+        self.window = window
+        self.min_new_per_page = min_new_per_page
+        self.deadline = deadline
+        self.recent = deque(maxlen=window)
+        self.pages = 0
+        self.new_ids = 0
+        self.total_results = None
+        self.started = time.monotonic()
+        self.stop_reason = None
+
+    def record_page(self, html, new_ids):
+        self.pages += 1
+        self.new_ids += new_ids
+        self.recent.append(new_ids)
+        if self.total_results is None:
+            self.total_results = parse_result_count(html)
+
+    def should_continue(self, next_start):
+        if self.total_results is not None and next_start >= self.total_results:
+            self.stop("result count reached")
+        elif len(self.recent) == self.window and sum(self.recent) < self.min_new_per_page * self.window:
+            self.stop("low yield")
+        elif self.deadline is not None and self.deadline.listings_over():
+            self.stop("deadline")
+        return self.stop_reason is None
+
+    def stop(self, reason):
+        if self.stop_reason is None:
+            self.stop_reason = reason
+
+def listing_failed(search_term, location, start, pagination, on_failure, error=None):
+    # Stops the query at a page that could not be fetched or parsed; on_failure gets
+    # the offset to resume it from. Running out of time is not a failure.
+    if isinstance(error, OutOfTime):
+        pagination.stop("deadline")
+        return
+    if error is None:
+        print(f"Failed to fetch {search_term} in {location} at start={start}")
+    else:
+        print(f"Error scraping {search_term} in {location} at start={start}: {error}")
+    pagination.stop("failed")
+    if on_failure:
+        on_failure(start)
+
+def scrape_job_listings(search_term, original_category, location, seen_job_ids_local, on_page=None, first_start=0, on_failure=None, pagination=None, known_ids=None):
+    # on_page, if given, receives each page's start offset, new listings and job ids as
+    # soon as it is parsed and returns how many were globally new. on_failure receives
+    # the start offset of a page that could not be fetched, after which the query
+    # stops so it can be resumed from that offset later.
     job_listings = []
-    encoded_job = quote(search_term)
-    encoded_location = quote(location)
+    pagination = pagination or PaginationController()
 
-    for start in range(0, MAX_RESULTS_PER_QUERY, RESULTS_PER_PAGE):
-        time.sleep(random.uniform(*DELAY_RANGE))
-        url = f"https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={encoded_job}&location={encoded_location}&start={start}"
+    for start in range(first_start, MAX_RESULTS_PER_QUERY, RESULTS_PER_PAGE):
+        url = listing_url(search_term, location, start)
 
         try:
-            response = requests.get(url, headers=get_random_headers())
+            response = fetcher.get(url, time_left=fetch_time_left(pagination.deadline))
             if response.status_code != 200:
-                print(f"Failed to fetch {search_term} in {location} at start={start}")
+                listing_failed(search_term, location, start, pagination, on_failure)
                 break
 
-            soup = BeautifulSoup(response.text, "html.parser")
-            jobs = soup.find_all("li")
-
-            if not jobs:
+            page_ids = []
+            page_listings = parse_job_listings(response.text, search_term, original_category, location,
+                                               seen_job_ids_local, known_ids, page_ids)
+            if page_listings is None:
+                pagination.stop("end of results")
+                break
+            if on_page:
+                new_ids = on_page(start, page_listings, page_ids)
+            else:
+                new_ids = len(page_listings)
+                job_listings.extend(page_listings)
+            pagination.record_page(response.text, new_ids)
+            if not pagination.should_continue(start + RESULTS_PER_PAGE):
                 break
 
-            for job in jobs:
-                base_card = job.find("div", class_="base-card")
-                if not base_card:
-                    continue
+        except Exception as e:
+            listing_failed(search_term, location, start, pagination, on_failure, e)
+            break
+    else:
+        pagination.stop("max results")
+
+    return job_listings
+
+def scrape_job_details(job, use_cache=True, time_left=None):
+    # Returns None when the job page could not be fetched or parsed; raises OutOfTime
+    # when the rate limiter would not let it fetch within time_left
+    job_post = new_job_post(job)
+
+    try:
+        if job_detail_source == "fragment":
+            response = fetcher.get(job_fragment_url(job.job_id), use_cache, time_left)
+            details = run_parse("fragment", response.text) if response.status_code == 200 else {}
+            if fragment_complete(job_post, details, response):
+                return job_post
+
+        response = fetcher.get(job_post.job_url, use_cache, time_left)
+        if not job_page_fetched(job, response):
+            return None
+
+        parse_job_details(response.text, job_post)
+
+    except OutOfTime:
+        raise
+    except Exception as e:
+        print(f"Error scraping job {job.job_id}: {e}")
+        return None
+
+    return job_post
 
-                job_id = base_card.get("data-entity-urn", "").split(":")[-1]
-                if not job_id or job_id in seen_job_ids_local:
+class Deadline:
+    # Time budget of a --deadline run, see DEADLINE_LISTING_SHARE
+    def __init__(self, seconds, listing_share=DEADLINE_LISTING_SHARE, flush_seconds=DEADLINE_FLUSH_SECONDS):
+        self.seconds = seconds
+        started = time.monotonic()
+        self.listings_end = started + seconds * listing_share
+        self.details_end = max(self.listings_end, started + seconds - flush_seconds)
+
+    def listings_over(self):
+        return time.monotonic() >= self.listings_end
+
+    def details_over(self):
+        return time.monotonic() >= self.details_end
+
+    def details_remaining(self):
+        return max(0.0, self.details_end - time.monotonic())
+
+def fetch_time_left(deadline):
+    # Bounds how long one fetch may wait on the rate limiter, see Fetcher.get
+    return deadline.details_remaining() if deadline is not None else None
+
+def parse_category_weight(value):
+    category, sep, weight = value.rpartition("=")
+    if not sep or not category:
+        raise ValueError(f"expected CATEGORY=WEIGHT, got '{value}'")
+    return category, float(weight)
+
+class RetryQueue:
+    # Failed work units wait here with exponential backoff until the tail of the run.
+    # Units that use up max_attempts are kept in `failed` for the final report.
+    def __init__(self, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self._lock = Lock()
+        self._heap = []
+        self._seq = 0
+        self.failed = []
+        self.retried = 0
+
+    def push(self, kind, payload, attempts=1):
+        with self._lock:
+            if attempts >= self.max_attempts:
+                self.failed.append((kind, payload))
+                return
+            delay = self.base_delay * 2 ** (attempts - 1) * random.uniform(1, 1.5)
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._seq, kind, payload, attempts))
+            self._seq += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
+
+    def pop_due(self, deadline=None):
+        # Waits for the earliest unit to come due, then returns every unit that is due;
+        # returns nothing when that would be past the deadline's detail time
+        with self._lock:
+            if not self._heap:
+                return []
+            wait = self._heap[0][0] - time.monotonic()
+        if deadline is not None and wait >= deadline.details_remaining():
+            return []
+        if wait > 0:
+            metrics.inc("sleep_seconds_total", wait, reason="retry_backoff")
+            time.sleep(wait)
+        due = []
+        with self._lock:
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, kind, payload, attempts = heapq.heappop(self._heap)
+                due.append((kind, payload, attempts))
+            self.retried += len(due)
+        return due
+
+class CrawlState:
+    # Everything one run shares between workers: global job-id dedup, the job store,
+    # the retry queue, the output writer and the frontier of unfinished work (next
+    # start offset per query, claimed jobs not yet scraped) for checkpoints.
+    def __init__(self, writer, store=None, checkpoint=None, planner=None, shard=None, listings_only=False,
+                 summary=False, deadline=None, category_weights=None):
+        self.writer = writer
+        self.store = store
+        self.checkpoint = checkpoint
+        self.planner = planner
+        self.shard = shard
+        self.listings_only = listings_only
+        self.summary = summary
+        self.deadline = deadline
+        self.category_weights = {**CATEGORY_WEIGHTS, **(category_weights or {})}
+        self.retry_queue = RetryQueue()
+        self.seen_job_ids = ShardedIdSet()
+        self.frontier_lock = Lock()
+        self.jobs_found = 0
+        self.query_starts = {}
+        self.done_queries = set()
+        self.queries_total = 0
+        self.pending_jobs = {}
+        self._last_checkpoint = time.monotonic()
+        self.listing_pages = 0
+        self.listing_new_ids = 0
+        self.stop_reasons = Counter()
+
+    def restore(self, frontier, rows):
+        # Rows finished before the checkpoint go straight back into the new output file
+        done_ids = set()
+        for row in rows:
+            done_ids.add(row["job_id"])
+            self.writer.write(row)
+        self.jobs_found = len(done_ids)
+        self.query_starts = {tuple(q[:3]): q[3] for q in frontier.get("query_starts", [])}
+        self.done_queries = {tuple(q) for q in frontier.get("done_queries", [])}
+        self.pending_jobs = {
+            job["job_id"]: JobRecord.from_dict(job) for job in frontier.get("pending_jobs", [])
+            if job["job_id"] not in done_ids
+        }
+        # Every claimed id is either done or pending; ids claimed while the checkpoint
+        # was taken are found again, since their page's start offset wasn't saved yet
+        self.seen_job_ids = ShardedIdSet(done_ids | self.pending_jobs.keys())
+        self.jobs_found = len(self.seen_job_ids)
+        print(f"Resuming from checkpoint: {len(done_ids)} jobs done, {len(self.pending_jobs)} pending, "
+              f"{len(self.done_queries)} queries finished")
+
+    def load_jobs(self, paths):
+        # Detail-only run over listings collected earlier (e.g. by --listings-only shards);
+        # every listing query counts as done and the shard keeps only the job ids it owns.
+        for path in paths:
+            for row in read_rows(path):
+                job_id = row["job_id"]
+                if self.shard is not None and not self.shard.owns_job(job_id):
+                    continue
+                if not self.seen_job_ids.add(job_id):
                     continue
+                self.pending_jobs[job_id] = JobRecord(*(row[key] for key in LISTING_FIELDS))
+        self.jobs_found = len(self.seen_job_ids)
+        self.done_queries = set(iter_queries())
+        print(f"Loaded {len(self.pending_jobs)} jobs to scrape from {len(paths)} listing files")
+
+    def resumed_jobs(self):
+        # Jobs claimed before the checkpoint but never scraped; call before any new claims
+        with self.frontier_lock:
+            jobs = list(self.pending_jobs.values())
+        if self.deadline is not None:
+            jobs.sort(key=lambda job: -self.category_weight(job.original_category))
+        return jobs
+
+    def category_weight(self, category):
+        return self.category_weights.get(category, 1.0)
+
+    def query_value(self, query):
+        # Expected new job ids per listing request, weighted by the query's category
+        expected = None
+        if self.planner is not None:
+            expected = self.planner.expected_yield.get((query[0], query[2]))
+            if expected is None:
+                expected = self.planner.default_yield()
+        return self.category_weight(query[1]) * (expected if expected is not None else 1.0)
+
+    def listings_closed(self):
+        return self.deadline is not None and self.deadline.listings_over()
+
+    def details_closed(self):
+        return self.deadline is not None and self.deadline.details_over()
+
+    def pending_queries(self):
+        queries = [
+            (*query, self.query_starts.get(query, 0))
+            for query in iter_queries()
+            if query not in self.done_queries
+            and (self.shard is None or self.shard.owns_query(query[1], query[2]))
+        ]
+        if self.planner is not None:
+            planned = self.planner.plan(queries)
+            print(f"Query planner: running {len(planned)} of {len(queries)} queries, "
+                  f"{len(self.planner.skipped)} skipped as redundant with higher-yield aliases")
+            queries = planned
+        if self.deadline is not None:
+            # Best value first, so whatever the budget cuts off is worth the least
+            queries.sort(key=lambda query: -self.query_value(query))
+        self.queries_total = len(queries)
+        return queries
+
+    def pending_count(self):
+        with self.frontier_lock:
+            return len(self.pending_jobs)
+
+    def page_done(self, query, next_start, page_ids, new_ids):
+        metrics.inc("listing_job_ids_total", new_ids, result="new")
+        metrics.inc("listing_job_ids_total", len(page_ids) - new_ids, result="duplicate")
+        with self.frontier_lock:
+            self.query_starts[query] = next_start
+        if self.store is not None:
+            self.store.record_query_hits(query[0], query[2], page_ids)
+        self.maybe_checkpoint()
+
+    def query_done(self, query):
+        with self.frontier_lock:
+            self.query_starts.pop(query, None)
+            self.done_queries.add(query)
+        if self.store is not None:
+            self.store.record_query_run(query[0], query[2])
+        self.maybe_checkpoint()
+
+    def record_pagination(self, pagination):
+        metrics.observe("listing_query_seconds", time.monotonic() - pagination.started)
+        metrics.inc("listing_queries_total", stop_reason=pagination.stop_reason)
+        metrics.inc("listing_pages_total", pagination.pages)
+        with self.frontier_lock:
+            self.listing_pages += pagination.pages
+            self.listing_new_ids += pagination.new_ids
+            self.stop_reasons[pagination.stop_reason] += 1
+
+    def claim_new_jobs(self, listings):
+        new_jobs = [job for job in listings if self.seen_job_ids.add(job.job_id)]
+
+        with self.frontier_lock:
+            for job in new_jobs:
+                self.pending_jobs[job.job_id] = job
+            self.jobs_found += len(new_jobs)
+
+        return new_jobs
+
+    def complete_from_card(self, job):
+        # Summary runs skip the job page for every row whose card had the summary fields
+        if not self.summary or any(job.get(field) is None for field in SUMMARY_REQUIRED_FIELDS):
+            return False
+        metrics.inc("detail_jobs_total", result="card")
+        self.add_result(job)
+        return True
+
+    def stored_job(self, job):
+        stored = self.store.get(job.job_id) if self.store is not None else None
+        if stored is None:
+            return None
+        metrics.inc("detail_jobs_total", result="stored")
+        # Keep this run's search context and today's card, whose time_posted is newer
+        # than the stored one; the store fills in the page's fields and any card gaps
+        job.update({field: stored.get(field) for field in PAGE_FIELDS})
+        job.update({field: stored.get(field) for field in CARD_FIELDS if job.get(field) is None})
+        return job
+
+    def refetching(self, job):
+        # A stored job being fetched again is due for a refresh; a cached copy of its
+        # page would only repeat what the store already has
+        return self.store is not None and job.job_id in self.store
+
+    def add_result(self, job_post):
+        with self.frontier_lock:
+            self.pending_jobs.pop(job_post.job_id, None)
+        started = time.perf_counter()
+        self.writer.write(job_post)
+        metrics.observe("output_write_seconds", time.perf_counter() - started, buckets=WRITE_BUCKETS)
+        processed = self.writer.rows
+        if self.checkpoint is not None:
+            self.checkpoint.append_row(job_post.to_dict())
+        if processed % 10 == 0:
+            print(f"Processed job details: {processed}/{self.jobs_found}")
+        self.maybe_checkpoint()
+
+    def record_detail(self, job, job_post, attempts=0, seconds=None):
+        if seconds is not None:
+            metrics.observe("detail_job_seconds", seconds)
+        metrics.inc("detail_jobs_total", result="failed" if job_post is None else "fetched")
+        if job_post is None:
+            self.retry_queue.push("detail", job, attempts + 1)
+            return
+        if self.store is not None:
+            self.store.put(job_post.to_dict())
+        self.add_result(job_post)
+
+    def flush_pending(self):
+        # Jobs a --deadline run never got to are written from their listing cards.
+        # Jobs whose page permanently failed (e.g. a 404) are left out: they were tried
+        # and are reported by print_retry_report instead.
+        failed_ids = {payload.job_id for kind, payload in self.retry_queue.failed if kind == "detail"}
+        with self.frontier_lock:
+            jobs = [job for job_id, job in self.pending_jobs.items() if job_id not in failed_ids]
+        for job in jobs:
+            metrics.inc("detail_jobs_total", result="unfetched")
+            self.add_result(job)
+        return len(jobs)
+
+    def maybe_checkpoint(self, force=False):
+        if self.checkpoint is None:
+            return
+        with self.frontier_lock:
+            now = time.monotonic()
+            if not force and now - self._last_checkpoint < CHECKPOINT_INTERVAL:
+                return
+            self._last_checkpoint = now
+            frontier = {
+                "saved_at": datetime.now().isoformat(timespec="seconds"),
+                "query_starts": [[*query, start] for query, start in self.query_starts.items()],
+                "done_queries": [list(query) for query in self.done_queries],
+                "pending_jobs": [job.to_dict(SUMMARY_FIELDS) for job in self.pending_jobs.values()]
+            }
+        self.checkpoint.save_frontier(frontier)
+
+def needs_job_page(state, job):
+    # Settles every job that can do without its job page; True for the rest
+    if state.listings_only:
+        state.add_result(job)
+        return False
+    if state.complete_from_card(job):
+        return False
+    job_post = state.stored_job(job)
+    if job_post is not None:
+        state.add_result(job_post)
+        return False
+    return not state.details_closed()
+
+def fetch_job(state, job, attempts=0):
+    started = time.monotonic()
+    try:
+        job_post = scrape_job_details(job, not state.refetching(job), fetch_time_left(state.deadline))
+    except OutOfTime:
+        # Left pending, so flush_pending writes it from its listing card
+        return
+    state.record_detail(job, job_post, attempts, time.monotonic() - started)
+
+def process_job(state, job, attempts=0):
+    if needs_job_page(state, job):
+        fetch_job(state, job, attempts)
+
+def record_queue_depth(job_queue):
+    depth = job_queue.qsize()
+    metrics.set_gauge("detail_queue_depth", depth)
+    metrics.observe("detail_queue_depth_samples", depth, buckets=DEPTH_BUCKETS)
+
+def requeue_jobs(jobs, job_queue):
+    for job in jobs:
+        job_queue.put(job)
+
+class ListingQuery:
+    # One listing query's bookkeeping, shared by both engines: each page's new jobs,
+    # the retry after a failed page and the report once the query stops. The engines
+    # only fetch and parse its pages and put the new jobs on their detail queue.
+    def __init__(self, state, alias, original_category, location, first_start=0, attempts=0):
+        self.state = state
+        self.query = (alias, original_category, location)
+        self.first_start = first_start
+        self.attempts = attempts
+        self.found = 0
+        self.failed = False
+        self.pagination = PaginationController(deadline=state.deadline)
+        if state.listings_closed():
+            self.pagination.stop("deadline")
+
+    def page_done(self, start, page_ids, new_jobs, job_queue):
+        # Called once new_jobs are on job_queue; returns how many there were
+        record_queue_depth(job_queue)
+        self.found += len(new_jobs)
+        self.state.page_done(self.query, start + RESULTS_PER_PAGE, page_ids, len(new_jobs))
+        return len(new_jobs)
+
+    def on_failure(self, start):
+        self.failed = True
+        # Pages before `start` were fetched, so progress resets the attempt budget
+        attempts = self.attempts + 1 if start == self.first_start else 1
+        self.state.retry_queue.push("listing", (*self.query, start), attempts)
+
+    def finish(self):
+        pagination = self.pagination
+        if not self.failed and pagination.stop_reason != "deadline":
+            self.state.query_done(self.query)
+        self.state.record_pagination(pagination)
+        if pagination.pages or pagination.stop_reason != "deadline":
+            alias, _, location = self.query
+            print(f"Found {self.found} new jobs using alias '{alias}' in {location} "
+                  f"({pagination.pages} pages, {pagination.stop_reason})")
+        return self.found
+
+def fetch_and_collect_jobs(alias, original_category, location, state, job_queue, first_start=0, attempts=0):
+    # Pushes every globally new job onto job_queue page by page; put() blocks while the
+    # queue is full, which throttles listing workers to the pace of the detail workers.
+    listing = ListingQuery(state, alias, original_category, location, first_start, attempts)
+
+    def on_page(start, page_listings, page_ids):
+        new_jobs = state.claim_new_jobs(page_listings)
+        for job in new_jobs:
+            job_queue.put(job)
+        return listing.page_done(start, page_ids, new_jobs, job_queue)
+
+    if listing.pagination.stop_reason is None:
+        scrape_job_listings(alias, original_category, location, set(), on_page, first_start, listing.on_failure,
+                            listing.pagination, state.seen_job_ids)
+    return listing.finish()
+
+def retry_unit(state, kind, payload, attempts):
+    if kind == "listing":
+        alias, original_category, location, start = payload
+        jobs = queue.SimpleQueue()
+        fetch_and_collect_jobs(alias, original_category, location, state, jobs, start, attempts)
+        while not jobs.empty():
+            process_job(state, jobs.get())
+    elif not state.details_closed():
+        fetch_job(state, payload, attempts)
+
+def process_retries(state):
+    while True:
+        due = state.retry_queue.pop_due(state.deadline)
+        if not due:
+            return
+        print(f"\nRetrying {len(due)} failed work units")
+        with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
+            futures = [executor.submit(retry_unit, state, *unit) for unit in due]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error retrying work unit: {e}")
+
+def print_pagination_report(state):
+    reasons = ", ".join(f"{reason} {count}" for reason, count in state.stop_reasons.most_common())
+    per_page = state.listing_new_ids / state.listing_pages if state.listing_pages else 0
+    print(f"Pagination: {state.listing_pages} listing pages fetched for {state.listing_new_ids} new job ids "
+          f"({per_page:.1f} per page); queries stopped by: {reasons or 'none'}")
+
+def print_retry_report(state):
+    retry_queue = state.retry_queue
+    print(f"Retries: {retry_queue.retried} work units retried, {len(retry_queue.failed)} permanently failed")
+    for kind, payload in retry_queue.failed:
+        if kind == "listing":
+            alias, _, location, start = payload
+            print(f"  listing '{alias}' in {location} from start={start}")
+        else:
+            print(f"  job {payload.job_id}")
+
+def iter_queries():
+    for job_category in JOB_CATEGORIES:
+        for alias in job_category["aliases"]:
+            for location in LOCATIONS:
+                yield alias, job_category["category"], location
+
+async def fetch_async(url, semaphore, executor, use_cache=True, time_left=None):
+    # Mirrors Fetcher.get, but waits for the rate limiter on the event loop so only
+    # the request itself occupies an executor thread.
+    cached = fetcher.cached(url) if use_cache else None
+    if cached is not None:
+        return cached
+    loop = asyncio.get_running_loop()
+    give_up_at = time.monotonic() + time_left if time_left is not None else None
+    attempt = 0
+    response = None
+    while True:
+        wait = fetcher.wait_time(url, give_up_at)
+        if wait is None:
+            if response is not None:
+                return response
+            raise OutOfTime(f"no time left to wait for {url}")
+        await asyncio.sleep(wait)
+        async with semaphore:
+            response = await loop.run_in_executor(executor, fetcher.fetch, url)
+        if not fetcher.should_retry(response, attempt):
+            return response
+        attempt += 1
+
+async def scrape_job_listings_async(search_term, original_category, location, seen_job_ids_local, semaphore, executor, on_page, on_failure, first_start=0, pagination=None, known_ids=None):
+    pagination = pagination or PaginationController()
+
+    for start in range(first_start, MAX_RESULTS_PER_QUERY, RESULTS_PER_PAGE):
+        try:
+            response = await fetch_async(listing_url(search_term, location, start), semaphore, executor,
+                                         time_left=fetch_time_left(pagination.deadline))
+            if response.status_code != 200:
+                listing_failed(search_term, location, start, pagination, on_failure)
+                break
 
-                seen_job_ids_local.add(job_id)
-                job_listings.append({
-                    "job_id": job_id,
-                    "original_category": original_category,
-                    "search_location": location,
-                    "search_term_used": search_term
-                })
+            page_ids = []
+            page_listings = build_job_listings(
+                await run_parse_async("listing", response.text, executor),
+                search_term, original_category, location, seen_job_ids_local, known_ids, page_ids
+            )
+            if page_listings is None:
+                pagination.stop("end of results")
+                break
+            pagination.record_page(response.text, await on_page(start, page_listings, page_ids))
+            if not pagination.should_continue(start + RESULTS_PER_PAGE):
+                break
 
         except Exception as e:
-            print(f"Error scraping {search_term} in {location}: {e}")
-            continue
+            listing_failed(search_term, location, start, pagination, on_failure, e)
+            break
+    else:
+        pagination.stop("max results")
 
-    return job_listings
-
-def scrape_job_details(job):
-    job_url = f"https://www.linkedin.com/jobs/view/{job['job_id']}"
-    job_post = {
-        **job,
-        "job_title": None,
-        "company_name": None,
-        "company_url": None,
-        "location": None,
-        "time_posted": None,
-        "num_applicants": None,
-        "employment_type": None,
-        "job_level": None,
-        "job_description": None,
-        "job_url": job_url
-    }
+async def scrape_job_details_async(job, semaphore, executor, use_cache=True, time_left=None):
+    job_post = new_job_post(job)
 
     try:
-        time.sleep(random.uniform(*DELAY_RANGE))
-        response = requests.get(job_url, headers=get_random_headers())
-        if response.status_code != 200:
-            return job_post
-
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        job_post["job_title"] = soup.find("h1", {"class": "top-card-layout__title"}).get_text(strip=True) if soup.find("h1", {"class": "top-card-layout__title"}) else None
-        company_tag = soup.find("a", {"class": "topcard__org-name-link"})
-        if company_tag:
-            job_post["company_name"] = company_tag.get_text(strip=True)
-            job_post["company_url"] = company_tag.get("href", "")
-        job_post["location"] = soup.find("span", {"class": "topcard__flavor--bullet"}).get_text(strip=True) if soup.find("span", {"class": "topcard__flavor--bullet"}) else None
-        job_post["time_posted"] = soup.find("span", {"class": "posted-time-ago__text"}).get_text(strip=True) if soup.find("span", {"class": "posted-time-ago__text"}) else None
-        job_post["num_applicants"] = soup.find("span", {"class": "num-applicants__caption"}).get_text(strip=True) if soup.find("span", {"class": "num-applicants__caption"}) else None
-
-        criteria = soup.find_all("span", {"class": "description__job-criteria-text"})
-        if criteria:
-            if len(criteria) > 0:
-                job_post["employment_type"] = criteria[0].get_text(strip=True)
-            if len(criteria) > 1:
-                job_post["job_level"] = criteria[1].get_text(strip=True)
-
-        desc = soup.find("div", {"class": "show-more-less-html__markup"})
-        if desc:
-            job_post["job_description"] = desc.get_text(strip=True)
+        if job_detail_source == "fragment":
+            response = await fetch_async(job_fragment_url(job.job_id), semaphore, executor, use_cache, time_left)
+            details = await run_parse_async("fragment", response.text, executor) if response.status_code == 200 else {}
+            if fragment_complete(job_post, details, response):
+                return job_post
+
+        response = await fetch_async(job_post.job_url, semaphore, executor, use_cache, time_left)
+        if not job_page_fetched(job, response):
+            return None
+
+        job_post.update(await run_parse_async("job", response.text, executor))
 
+    except OutOfTime:
+        raise
     except Exception as e:
-        print(f"Error scraping job {job['job_id']}: {e}")
+        print(f"Error scraping job {job.job_id}: {e}")
+        return None
 
     return job_post
 
-def fetch_and_collect_jobs(alias, original_category, location, seen_job_ids_lock, seen_job_ids):
-    local_seen = set()
-    listings = scrape_job_listings(alias, original_category, location, local_seen)
-    new_jobs = []
-
-    with seen_job_ids_lock:
-        for job in listings:
-            if job['job_id'] not in seen_job_ids:
-                seen_job_ids.add(job['job_id'])
-                new_jobs.append(job)
-
-    print(f"Found {len(new_jobs)} new jobs using alias '{alias}' in {location}")
-    return new_jobs
-
-def main():
-    seen_job_ids = set()
-    seen_job_ids_lock = Lock()
-    all_jobs = []
-
-    with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-        future_to_params = []
-
-        for job_category in JOB_CATEGORIES:
-            original_category = job_category["category"]
-            print(f"\nProcessing category: {original_category}")
-
-            for alias in job_category["aliases"]:
-                for location in LOCATIONS:
-                    future = executor.submit(
-                        fetch_and_collect_jobs,
-                        alias, original_category, location,
-                        seen_job_ids_lock, seen_job_ids
-                    )
-                    future_to_params.append(future)
-
-        for i, future in enumerate(future_to_params):
+async def fetch_job_async(state, job, semaphore, executor):
+    # Mirrors fetch_job; a job out of time is likewise left pending
+    started = time.monotonic()
+    try:
+        job_post = await scrape_job_details_async(job, semaphore, executor, not state.refetching(job),
+                                                  fetch_time_left(state.deadline))
+    except OutOfTime:
+        return
+    state.record_detail(job, job_post, seconds=time.monotonic() - started)
+
+async def crawl_async(state):
+    semaphore = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    job_queue = asyncio.Queue(maxsize=DETAIL_QUEUE_SIZE)
+    resumed_jobs = state.resumed_jobs()
+
+    async def collect_jobs(alias, original_category, location, first_start):
+        listing = ListingQuery(state, alias, original_category, location, first_start)
+
+        async def on_page(start, page_listings, page_ids):
+            new_jobs = state.claim_new_jobs(page_listings)
+            for job in new_jobs:
+                await job_queue.put(job)
+            return listing.page_done(start, page_ids, new_jobs, job_queue)
+
+        if listing.pagination.stop_reason is None:
+            await scrape_job_listings_async(alias, original_category, location, set(), semaphore, executor, on_page,
+                                            listing.on_failure, first_start, listing.pagination, state.seen_job_ids)
+        return listing.finish()
+
+    async def resume_pending_jobs():
+        for job in resumed_jobs:
+            await job_queue.put(job)
+
+    async def detail_worker():
+        while True:
+            job = await job_queue.get()
+            if job is None:
+                return
+            try:
+                if needs_job_page(state, job):
+                    await fetch_job_async(state, job, semaphore, executor)
+            except Exception as e:
+                print(f"Error processing job details: {e}")
+
+    with ThreadPoolExecutor(max_workers=ASYNC_CONCURRENCY) as executor:
+        workers = [asyncio.create_task(detail_worker()) for _ in range(ASYNC_CONCURRENCY)]
+        tasks = [resume_pending_jobs(), *(collect_jobs(*query) for query in state.pending_queries())]
+        for task in asyncio.as_completed(tasks):
             try:
-                listings = future.result()
-                all_jobs.extend(listings)
-                if (i + 1) % 10 == 0:
-                    print(f"Fetched listings: {i + 1}/{len(future_to_params)}")
+                await task
             except Exception as e:
                 print(f"Error fetching listings: {e}")
 
-    print(f"\nTotal unique jobs collected: {len(all_jobs)}")
+        print(f"\nTotal unique jobs collected: {state.jobs_found}")
+        for _ in workers:
+            await job_queue.put(None)
+        await asyncio.gather(*workers)
+
+def crawl_threads(state):
+    job_queue = queue.Queue(maxsize=DETAIL_QUEUE_SIZE)
+    resumed_jobs = state.resumed_jobs()
 
-    job_details = []
-    with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-        futures = [executor.submit(scrape_job_details, job) for job in all_jobs]
-        for i, future in enumerate(futures):
+    def detail_worker():
+        while True:
+            job = job_queue.get()
+            if job is None:
+                return
             try:
-                result = future.result()
-                job_details.append(result)
-                if (i + 1) % 10 == 0:
-                    print(f"Processed job details: {i + 1}/{len(all_jobs)}")
+                process_job(state, job)
             except Exception as e:
                 print(f"Error processing job details: {e}")
 
-    df = pd.DataFrame(job_details)
-    filename = f"linkedin_jobs_{datetime.now().strftime('%Y-%m-%d')}.csv"
-    df.to_csv(filename, index=False)
+    with ThreadPoolExecutor(max_workers=MAX_THREADS) as detail_executor:
+        workers = [detail_executor.submit(detail_worker) for _ in range(MAX_THREADS)]
+
+        with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
+            future_to_params = [executor.submit(requeue_jobs, resumed_jobs, job_queue)]
+
+            for alias, original_category, location, first_start in state.pending_queries():
+                future = executor.submit(
+                    fetch_and_collect_jobs,
+                    alias, original_category, location,
+                    state, job_queue, first_start
+                )
+                future_to_params.append(future)
+
+            for future in as_completed(future_to_params):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error fetching listings: {e}")
+
+        print(f"\nTotal unique jobs collected: {state.jobs_found}")
+        for _ in workers:
+            job_queue.put(None)
+
+def crawl_progress(state, interval):
+    # Listing queries and detail jobs are separate stages of the progress line
+    def listing_sample():
+        done = metrics.total("listing_queries_total")
+        failed = metrics.total("listing_queries_total", stop_reason="failed")
+        return done, max(state.queries_total - done, 0), failed, done, fetcher.in_flight("listing")
+
+    def detail_sample():
+        failed = metrics.total("detail_jobs_total", result="failed")
+        attempts = metrics.total("detail_jobs_total", result="fetched") + failed
+        return state.writer.rows, state.pending_count(), failed, attempts, fetcher.in_flight("job", "fragment")
+
+    return ProgressReporter([Stage("listings", "queries", listing_sample), Stage("details", "jobs", detail_sample)],
+                            interval)
+
+def build_run_report(state, seconds):
+    report = metrics.report()
+    requests_by_status = Counter()
+    for entry in report["counters"].get("http_requests_total", []):
+        requests_by_status[entry["labels"]["status"]] += entry["value"]
+    new_ids = metrics.total("listing_job_ids_total", result="new")
+    fetched = metrics.total("detail_jobs_total", result="fetched")
+    detail_bytes = metrics.total("http_response_bytes_total", kind="job") + \
+        metrics.total("http_response_bytes_total", kind="fragment")
+    duplicate_ids = metrics.total("listing_job_ids_total", result="duplicate")
+    summary = {
+        "duration_seconds": round(seconds, 3),
+        "requests_by_status": dict(requests_by_status),
+        "bytes_received": metrics.total("http_response_bytes_total"),
+        "bytes_decoded": metrics.total("http_body_bytes_total"),
+        "bodies_truncated": {reason: metrics.total("http_bodies_truncated_total", reason=reason)
+                             for reason in ("marker", "cap")},
+        # Summed over all workers, so these can add up to more than the run's duration
+        "worker_seconds": {
+            "sleeping": round(metrics.total("sleep_seconds_total"), 3),
+            "fetching": round(fetcher.stats()["fetch_seconds"], 3),
+            "parsing": round(parse_timer.seconds, 3)
+        },
+        "listing_job_ids": {
+            "new": new_ids,
+            "duplicate": duplicate_ids,
+            "duplicate_ratio": round(duplicate_ids / (new_ids + duplicate_ids), 3) if new_ids + duplicate_ids else 0.0
+        },
+        "detail_jobs": {result: metrics.total("detail_jobs_total", result=result)
+                        for result in ("fetched", "stored", "card", "failed", "unfetched")},
+        "detail_source": job_detail_source,
+        "detail_bytes_per_job": round(detail_bytes / fetched) if fetched else 0,
+        "detail_fragment_fallbacks": metrics.total("detail_fragment_fallbacks_total"),
+        "rows_written": state.writer.rows,
+        "retries": {"retried": state.retry_queue.retried, "failed": len(state.retry_queue.failed)},
+        "rate_limiter": rate_limiter.metrics()
+    }
+    if fetcher.cache is not None:
+        summary["cache"] = fetcher.cache.stats()
+    if state.deadline is not None:
+        summary["deadline"] = {
+            "budget_seconds": state.deadline.seconds,
+            "queries_cut": metrics.total("listing_queries_total", stop_reason="deadline"),
+            "jobs_unfetched": metrics.total("detail_jobs_total", result="unfetched")
+        }
+    return {"summary": summary, **report}
+
+def write_run_report(state, seconds, metrics_path, prometheus_path):
+    if metrics_path:
+        write_report(metrics_path, build_run_report(state, seconds))
+        print(f"Run metrics written to {metrics_path}")
+    if prometheus_path:
+        with open(prometheus_path, "w", encoding="utf-8") as f:
+            f.write(metrics.to_prometheus())
+        print(f"Prometheus metrics written to {prometheus_path}")
+
+def main(engine="threads", store_path=STORE_PATH, max_age_days=STORE_MAX_AGE_DAYS,
+         checkpoint_dir=CHECKPOINT_DIR, resume=False, checkpoint_max_age=CHECKPOINT_MAX_AGE,
+         parser_backend=PARSER_BACKEND, parse_workers=PARSE_WORKERS, plan_queries=True, shard=None,
+         listings_only=False, jobs_from=None,
+         output_format=OUTPUT_FORMAT, cache_path=CACHE_PATH, cache_max_bytes=CACHE_MAX_BYTES, refresh_policy=True,
+         metrics_path=METRICS_PATH, prometheus_path=None, summary=False, detail_source=DETAIL_SOURCE,
+         progress_interval=PROGRESS_INTERVAL, deadline_minutes=None, category_weights=None):
+    global page_parser, parse_pool, metrics, job_detail_source
+    started = time.monotonic()
+    deadline = Deadline(deadline_minutes * 60) if deadline_minutes else None
+    metrics = fetcher.metrics = Metrics()
+    page_parser = get_parser(parser_backend)
+    job_detail_source = detail_source
+    if parse_workers:
+        parse_pool = ProcessPoolExecutor(max_workers=parse_workers, initializer=init_parse_worker,
+                                         initargs=(page_parser.name,))
+        print(f"Parsing pages with the {page_parser.name} backend in {parse_workers} worker processes")
+    else:
+        print(f"Parsing pages with the {page_parser.name} backend")
+    fetcher.cache = ResponseCache(cache_path, CACHE_TTLS, cache_max_bytes) if cache_path else None
+    policy = RefreshPolicy(max_interval=max_age_days * 86400) if refresh_policy else None
+    store = JobStore(store_path, max_age=max_age_days * 86400, refresh_policy=policy) if store_path else None
+    if store is not None:
+        known_ids = store.index_ids()
+        print(f"Job store: {len(known_ids)} known job ids indexed in {known_ids.nbytes() / 1024:.0f} KiB")
+    suffix = shard.suffix() if shard is not None else ""
+    if metrics_path and suffix:
+        metrics_path = suffix.join(os.path.splitext(metrics_path))
+    if shard is not None:
+        print(f"Running shard {shard}")
+    checkpoint = Checkpoint(checkpoint_dir + suffix) if checkpoint_dir else None
+    planner = QueryPlanner(store) if store is not None and plan_queries else None
+    filename = f"linkedin_jobs_{datetime.now().strftime('%Y-%m-%d')}{suffix}.{output_format}"
+    writer = open_writer(filename, LISTING_FIELDS if listings_only else SUMMARY_FIELDS if summary else OUTPUT_FIELDS)
+    state = CrawlState(writer, store, checkpoint, planner, shard=shard, listings_only=listings_only, summary=summary,
+                       deadline=deadline, category_weights=category_weights)
+    if deadline is not None:
+        print(f"Deadline in {deadline_minutes:g} min: listing pages stop after "
+              f"{(deadline.listings_end - started) / 60:.1f} min, job pages after {(deadline.details_end - started) / 60:.1f} min")
+    restored = False
+    if checkpoint is not None:
+        if resume and checkpoint.exists() and (checkpoint.age() or 0) > checkpoint_max_age:
+            print(f"Checkpoint in {checkpoint.directory} is {checkpoint.age() / 3600:.1f} hours old, "
+                  f"discarding it and starting a fresh run")
+            resume = False
+        if resume and checkpoint.exists():
+            state.restore(*checkpoint.load())
+            restored = True
+        elif resume:
+            print(f"No checkpoint found in {checkpoint.directory}, starting a fresh run")
+        checkpoint.open(resume=resume)
+    if jobs_from and not restored:
+        state.load_jobs(jobs_from)
+
+    progress = crawl_progress(state, progress_interval).start() if progress_interval else None
+    if engine == "async":
+        asyncio.run(crawl_async(state))
+    else:
+        crawl_threads(state)
+    process_retries(state)
+    if deadline is not None:
+        unfetched = state.flush_pending()
+        if unfetched:
+            print(f"Deadline reached: {unfetched} jobs written from their listing cards without job page details")
+    if progress is not None:
+        progress.stop()
+    state.maybe_checkpoint(force=True)
+    if parse_pool is not None:
+        parse_pool.shutdown()
+        parse_pool = None
+
+    print_fetch_stats()
+    print_pagination_report(state)
+    print_retry_report(state)
+    fetcher.close()
+    if store is not None:
+        stats = store.stats()
+        print(f"Job store: {stats['served_from_store']} served from store, {stats['fetched']} fetched, "
+              f"{stats['jobs']} jobs tracked in {store_path}")
+        if policy is not None:
+            decisions = policy.stats()
+            print(f"Refresh policy: {decisions['refetched']} stored jobs due for a refetch, {decisions['reused']} reused")
+        store.close()
+
+    writer.close()
+    # Written while the response cache is still open, so its stats make the report
+    write_run_report(state, time.monotonic() - started, metrics_path, prometheus_path)
+    if fetcher.cache is not None:
+        fetcher.cache.close()
+        fetcher.cache = None
+    if checkpoint is not None:
+        checkpoint.clear()
     print(f"\nScraping complete. Data saved to: {filename}")
     return filename
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape LinkedIn guest job listings into a CSV file.")
+    parser.add_argument("--engine", choices=["threads", "async"], default="threads",
+                        help="crawl with a thread pool (default) or an asyncio event loop")
+    parser.add_argument("--store", default=STORE_PATH,
+                        help=f"SQLite job store used to skip already scraped jobs (default: {STORE_PATH})")
+    parser.add_argument("--no-store", action="store_const", const=None, dest="store",
+                        help="fetch every job detail page, ignoring the job store")
+    parser.add_argument("--max-age-days", type=float, default=STORE_MAX_AGE_DAYS,
+                        help=f"always refetch stored jobs older than this (default: {STORE_MAX_AGE_DAYS})")
+    parser.add_argument("--no-refresh-policy", action="store_false", dest="refresh_policy",
+                        help="refetch stored jobs only once they reach --max-age-days, regardless of posting age "
+                             "and past changes")
+    parser.add_argument("--cache", default=CACHE_PATH, dest="cache_path",
+                        help=f"SQLite cache of fetched pages, reused until their TTL runs out (default: {CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_const", const=None, dest="cache_path",
+                        help="always go to the network")
+    parser.add_argument("--cache-max-mb", type=float, default=CACHE_MAX_BYTES / 2 ** 20,
+                        help=f"evict least recently used pages beyond this size (default: {CACHE_MAX_BYTES // 2 ** 20})")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR,
+                        help=f"directory for crash-resume checkpoints (default: {CHECKPOINT_DIR})")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the last checkpoint instead of starting over")
+    parser.add_argument("--checkpoint-max-hours", type=float, default=CHECKPOINT_MAX_AGE / 3600,
+                        help=f"on --resume, discard checkpoints older than this (default: {CHECKPOINT_MAX_AGE // 3600})")
+    parser.add_argument("--parser", choices=["auto", *PARSERS], default=PARSER_BACKEND,
+                        help="HTML parser backend; auto picks the fastest one installed (default: auto)")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="parse pages in this many worker processes; 0 parses in the fetching threads (default: 0)")
+    parser.add_argument("--no-plan", action="store_false", dest="plan_queries",
+                        help="run every alias x location query instead of skipping ones previous runs found redundant")
+    parser.add_argument("--metrics", default=METRICS_PATH, dest="metrics_path",
+                        help=f"write request, timing, queue and dedup metrics for the run as JSON (default: {METRICS_PATH})")
+    parser.add_argument("--no-metrics", action="store_const", const=None, dest="metrics_path",
+                        help="skip the JSON metrics report")
+    parser.add_argument("--prometheus", metavar="PATH", dest="prometheus_path",
+                        help="also write the metrics in Prometheus text format")
+    parser.add_argument("--deadline", type=float, metavar="MINUTES",
+                        help="finish within this many minutes: run the highest-value queries first, stop requesting "
+                             "listing and then job pages as time runs out, and write unfetched jobs from their cards")
+    parser.add_argument("--category-weight", type=parse_category_weight, action="append", metavar="CATEGORY=WEIGHT",
+                        help="weight a category's queries and jobs when ordering a --deadline run (default: 1)")
+    parser.add_argument("--progress-interval", type=float, default=PROGRESS_INTERVAL, metavar="SECONDS",
+                        help="print jobs/s, ETA, in-flight requests and error rate per stage this often; 0 turns it "
+                             f"off (default: {PROGRESS_INTERVAL})")
+    parser.add_argument("--format", choices=list(OUTPUT_FORMATS), default=OUTPUT_FORMAT, dest="output_format",
+                        help="output file format; rows are appended as each job finishes (default: csv)")
+    parser.add_argument("--shard", type=Shard.parse, metavar="I/N",
+                        help="run only shard I (0-based) of N: a stable slice of the category x location queries, "
+                             "or of the job ids with --jobs-from")
+    parser.add_argument("--detail-source", choices=DETAIL_SOURCES, default=DETAIL_SOURCE,
+                        help="read job details from the full job page or from the much smaller guest jobPosting "
+                             "fragment, falling back to the page when the fragment lacks fields (default: page)")
+    parser.add_argument("--summary", action="store_true",
+                        help="write title, company, location and posting date straight from the listing cards; "
+                             "job pages are only fetched for cards missing one of them")
+    parser.add_argument("--listings-only", action="store_true",
+                        help="collect job ids from listing pages and skip detail pages")
+    parser.add_argument("--jobs-from", nargs="+", metavar="FILE",
+                        help="skip listing pages and scrape details for the jobs in these output files")
+    parser.add_argument("--merge", nargs="+", metavar="FILE",
+                        help="merge shard output files into one file, keeping one row per job_id, and exit")
+    parser.add_argument("--output", help="file written by --merge (default: linkedin_jobs_<date>.<format>)")
+    return parser.parse_args(argv)
+
+def merge_main(paths, output=None, output_format=OUTPUT_FORMAT):
+    filename = output or f"linkedin_jobs_{datetime.now().strftime('%Y-%m-%d')}.{output_format}"
+    written, total = merge_outputs(paths, filename)
+    print(f"Merged {total} rows from {len(paths)} files into {written} unique jobs: {filename}")
+    return filename
+
 if __name__ == "__main__":
-    print(main())
+    args = parse_args()
+    if args.merge:
+        print(merge_main(args.merge, args.output, args.output_format))
+    else:
+        print(main(engine=args.engine, store_path=args.store, max_age_days=args.max_age_days,
+                   checkpoint_dir=args.checkpoint_dir, resume=args.resume,
+                   checkpoint_max_age=args.checkpoint_max_hours * 3600, parser_backend=args.parser,
+                   parse_workers=args.parse_workers, plan_queries=args.plan_queries, shard=args.shard,
+                   listings_only=args.listings_only, jobs_from=args.jobs_from, output_format=args.output_format,
+                   cache_path=args.cache_path, cache_max_bytes=int(args.cache_max_mb * 2 ** 20),
+                   refresh_policy=args.refresh_policy, metrics_path=args.metrics_path,
+                   prometheus_path=args.prometheus_path, summary=args.summary,
+                   detail_source=args.detail_source, progress_interval=args.progress_interval,
+                   deadline_minutes=args.deadline, category_weights=dict(args.category_weight or ())))
 
 
 
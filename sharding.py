@@ -0,0 +1,74 @@
+import zlib
+
+from output import open_writer, read_rows
+from parsers import PAGE_FIELDS
+
+
+def parse_shard(value):
+    # "i/N" with a zero-based shard index, e.g. "0/4" .. "3/4"
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got '{value}'")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in 0..{count - 1}, got '{value}'")
+    return index, count
+
+
+def shard_of(key, count):
+    # Stable across runs, machines and Python versions (unlike hash())
+    return zlib.crc32(str(key).encode("utf-8")) % count
+
+
+class Shard:
+    # One slice of the daily run. Queries are split by (category, location) so aliases
+    # of the same category, which overlap the most, land on the same runner and get
+    # deduplicated there; job ids are split on their own for detail-only runs.
+    def __init__(self, index, count):
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, value):
+        return cls(*parse_shard(value))
+
+    def owns_query(self, category, location):
+        return shard_of(f"{category}|{location}", self.count) == self.index
+
+    def owns_job(self, job_id):
+        return shard_of(job_id, self.count) == self.index
+
+    def suffix(self):
+        return f".shard-{self.index}-of-{self.count}"
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+
+def has_details(row):
+    # Cards fill job_title too, so only the page's own fields tell a fetched row apart
+    return any(row.get(field) for field in PAGE_FIELDS)
+
+
+def merge_outputs(paths, output):
+    # Combine shard outputs into one file, keeping one row per job_id. A job several
+    # shards found keeps its first row with scraped details over listing-only rows.
+    # Two passes over the inputs so only job ids, not rows, are held in memory.
+    best = {}
+    fieldnames = []
+    for file_index, path in enumerate(paths):
+        for row_index, row in enumerate(read_rows(path, fieldnames)):
+            key = (file_index, row_index)
+            current = best.get(row["job_id"])
+            if current is None or (not current[1] and has_details(row)):
+                best[row["job_id"]] = (key, has_details(row))
+
+    total = 0
+    writer = open_writer(output, fieldnames)
+    for file_index, path in enumerate(paths):
+        for row_index, row in enumerate(read_rows(path)):
+            total += 1
+            if best[row["job_id"]][0] == (file_index, row_index):
+                writer.write(row)
+    writer.close()
+    return writer.rows, total